@@ -1,39 +1,202 @@
 from pybricks.parameters import Stop
 from pybricks.pupdevices import Motor
+from pybricks.tools import multitask, run_task
+
+import kinematics
+import profiling
+
+try:
+    from ustruct import calcsize, pack, unpack
+except ImportError:
+    from struct import calcsize, pack, unpack
 
 
 _LEFT_ARM_DOWN_ANGLE = 108
 _RIGHT_ARM_DOWN_ANGLE = -81
 _STALL_DUTY_LIMIT = 30
 _INIT_SPEED = 200
+_ARM_SPEED = 200
+
+# Named (left, right) arm positions, in percent of each arm's travel from
+# up (0) to down (100). None leaves that arm where it is.
+POSES = {
+    "up": (0, 0),
+    "down": (100, 100),
+    "left_down": (100, 0),
+    "right_down": (0, 100),
+    "carry": (5, 5),
+}
+
+# Where the arm calibration is kept in the hub's storage, and its layout:
+# a tag, the absolute encoder angle of each arm's zero, and each arm's
+# travel from up (0) to down (100).
+_CALIBRATION_OFFSET = 0
+_CALIBRATION_FORMAT = "<4shhhh"
+_CALIBRATION_TAG = b"ALP1"
+
+# How far outside its travel an arm may seem to be before the stored
+# calibration is no longer trusted, in degrees.
+_VERIFY_TOLERANCE = 10
+
+
+def _wrap(angle: float) -> float:
+    """Wraps an angle into the range [-180, 180)."""
+    return (angle + 180) % 360 - 180
+
+
+def _synchronized_speed(
+    angle: float,
+    duration: float,
+    speed: float,
+    acceleration: float,
+) -> float:
+    """The speed at which a move of `angle` takes `duration` milliseconds.
+
+    Solves `kinematics.profile_duration(angle, v, acceleration) ==
+    duration` for v. Returns `speed` if the move can't be made that slow.
+    """
+    angle = abs(angle)
+    seconds = duration / 1000
+    # Time and distance are related by t = d / v + v / a while cruising.
+    root = (acceleration * seconds) ** 2 - 4 * acceleration * angle
+    if angle == 0 or root < 0:
+        return speed
+    return min(speed, (acceleration * seconds - root**0.5) / 2)
+
+
+def _absolute_angle(motor: Motor) -> float:
+    """Resets `motor` to its absolute encoder angle and returns it."""
+    motor.reset_angle()
+    return motor.angle()
+
 
 class AttachmentAlpha:
     def __init__(
         self,
         left_motor: Motor,
         right_motor: Motor,
+        hub=None,
     ):
+        """Creates the attachment.
+
+        Args:
+            left_motor: The left arm motor.
+            right_motor: The right arm motor.
+            hub: If set, the hub whose storage keeps the arm calibration
+                between runs, so `init` doesn't have to home the arms.
+        """
         self.left_motor = left_motor
         self.right_motor = right_motor
+        self.hub = hub
+        self.left_down_angle = _LEFT_ARM_DOWN_ANGLE
+        self.right_down_angle = _RIGHT_ARM_DOWN_ANGLE
+        # Whether the last `init` homed the arms or used the calibration.
+        self.homed = False
 
-    def left_arm_init(self):
-        self.left_motor.run_until_stalled(
-            -_INIT_SPEED,
-            duty_limit=_STALL_DUTY_LIMIT,
+    async def home_async(self):
+        """Homes both arms at the same time against their stops."""
+        await multitask(
+            self.left_motor.run_until_stalled(
+                -_INIT_SPEED,
+                duty_limit=_STALL_DUTY_LIMIT,
+            ),
+            self.right_motor.run_until_stalled(
+                _INIT_SPEED,
+                duty_limit=_STALL_DUTY_LIMIT,
+            ),
         )
+        left_zero = _absolute_angle(self.left_motor)
+        right_zero = _absolute_angle(self.right_motor)
         self.left_motor.reset_angle(0)
+        self.right_motor.reset_angle(0)
+        self.save_calibration(left_zero, right_zero)
+
+    def load_calibration(self):
+        """Reads the calibration from the hub's storage.
 
-    def right_arm_init(self):
-        self.right_motor.run_until_stalled(
-            _INIT_SPEED,
-            duty_limit=_STALL_DUTY_LIMIT,
+        Returns: (left zero, right zero, left travel, right travel), or None
+          if nothing is stored.
+        """
+        if self.hub is None:
+            return None
+        data = self.hub.system.storage(
+            _CALIBRATION_OFFSET, read=calcsize(_CALIBRATION_FORMAT),
         )
-        self.right_motor.reset_angle(0)
+        tag, *calibration = unpack(_CALIBRATION_FORMAT, data)
+        if tag != _CALIBRATION_TAG:
+            return None
+        return calibration
+
+    def save_calibration(
+        self,
+        left_zero: float,
+        right_zero: float,
+    ):
+        """Stores the absolute angles of the arms' zeros and their travel."""
+        if self.hub is None:
+            return
+        self.hub.system.storage(
+            _CALIBRATION_OFFSET,
+            write=pack(
+                _CALIBRATION_FORMAT,
+                _CALIBRATION_TAG,
+                int(left_zero),
+                int(right_zero),
+                int(self.left_down_angle),
+                int(self.right_down_angle),
+            ),
+        )
+
+    def _verify_arm(self, motor: Motor, zero: float, travel: float) -> bool:
+        """Sets `motor`'s angle from its stored zero, if it looks right."""
+        angle = _wrap(_absolute_angle(motor) - zero)
+        low = min(0, travel) - _VERIFY_TOLERANCE
+        high = max(0, travel) + _VERIFY_TOLERANCE
+        if not low <= angle <= high:
+            return False
+        motor.reset_angle(angle)
+        return True
 
-    def init(self):
-        self.left_arm_init()
-        self.right_arm_init()
+    def verify(self) -> bool:
+        """Sets the arm angles from the stored calibration, without moving.
 
+        The absolute encoders tell where each arm is relative to its stored
+        zero. If either arm seems to be outside its travel, the calibration
+        is not trusted.
+
+        Returns: True if the calibration was used.
+        """
+        calibration = self.load_calibration()
+        if calibration is None:
+            return False
+        left_zero, right_zero, left_travel, right_travel = calibration
+        if not (
+            self._verify_arm(self.left_motor, left_zero, left_travel)
+            and self._verify_arm(self.right_motor, right_zero, right_travel)
+        ):
+            return False
+        self.left_down_angle = left_travel
+        self.right_down_angle = right_travel
+        return True
+
+    @profiling.profile
+    def init(self, force: bool = False):
+        """Zeroes both arms.
+
+        Uses the stored calibration if it checks out, and otherwise homes
+        both arms at once against their stops and stores the result. The
+        stored travel of each arm is used from then on, so after changing
+        `_LEFT_ARM_DOWN_ANGLE` or `_RIGHT_ARM_DOWN_ANGLE`, run with
+        `force=True` once.
+
+        Args:
+            force: Always home the arms.
+        """
+        self.homed = force or not self.verify()
+        if self.homed:
+            run_task(self.home_async())
+
+    @profiling.profile
     def left_arm_move(
         self,
         speed: float,
@@ -41,14 +204,15 @@ class AttachmentAlpha:
         then=Stop.HOLD,
         wait=True,
     ):
-        angle = position / 100 * _LEFT_ARM_DOWN_ANGLE
-        self.left_motor.run_target(
+        angle = position / 100 * self.left_down_angle
+        return self.left_motor.run_target(
             speed=speed,
             target_angle=angle,
             then=then,
             wait=wait,
         )
 
+    @profiling.profile
     def right_arm_move(
         self,
         speed: float,
@@ -56,10 +220,114 @@ class AttachmentAlpha:
         then=Stop.HOLD,
         wait=True,
     ):
-        angle = position / 100 * _RIGHT_ARM_DOWN_ANGLE
-        self.right_motor.run_target(
+        angle = position / 100 * self.right_down_angle
+        return self.right_motor.run_target(
             speed=speed,
             target_angle=angle,
             then=then,
             wait=wait,
-        )
\ No newline at end of file
+        )
+
+    def stop(self):
+        """Stops both arms and holds them where they are."""
+        self.left_motor.hold()
+        self.right_motor.hold()
+
+    def _pose_targets(self, pose, left, right) -> tuple:
+        """The (left, right) motor angles for a pose, None to stay."""
+        if pose is not None:
+            pose_left, pose_right = POSES[pose]
+            if left is None:
+                left = pose_left
+            if right is None:
+                right = pose_right
+        return (
+            None if left is None else left / 100 * self.left_down_angle,
+            None if right is None else right / 100 * self.right_down_angle,
+        )
+
+    async def move_to_pose_async(
+        self,
+        pose: str | None = None,
+        left: float | None = None,
+        right: float | None = None,
+        speed: float = _ARM_SPEED,
+        sync: bool = True,
+        then=Stop.HOLD,
+    ):
+        """Awaitable version of `move_to_pose`."""
+        left, right = self._pose_targets(pose, left, right)
+        # Each motor accelerates as its own controller is set to, which is
+        # what the other arm moves use too.
+        moves = [
+            (
+                motor,
+                target,
+                target - motor.angle(),
+                motor.control.limits()[1],
+            )
+            for motor, target in (
+                (self.left_motor, left),
+                (self.right_motor, right),
+            )
+            if target is not None
+        ]
+        if not moves:
+            return
+        duration = max(
+            kinematics.profile_duration(angle, speed, acceleration)
+            for _, _, angle, acceleration in moves
+        )
+        await multitask(
+            *[
+                motor.run_target(
+                    speed=(
+                        _synchronized_speed(
+                            angle, duration, speed, acceleration,
+                        )
+                        if sync
+                        else speed
+                    ),
+                    target_angle=target,
+                    then=then,
+                )
+                for motor, target, angle, acceleration in moves
+            ]
+        )
+
+    @profiling.profile
+    def move_to_pose(
+        self,
+        pose: str | None = None,
+        left: float | None = None,
+        right: float | None = None,
+        speed: float = _ARM_SPEED,
+        sync: bool = True,
+        then=Stop.HOLD,
+    ):
+        """Moves both arms at the same time and waits until both are done.
+
+        ```
+        attachment.move_to_pose("up")
+        attachment.move_to_pose(left=20, right=20)
+        attachment.move_to_pose("down", right=60)
+        ```
+
+        Args:
+            pose: The name of a pose in `POSES`.
+            left: The left arm position in percent, overriding the pose.
+            right: The right arm position in percent, overriding the pose.
+            speed: The speed of the arm with the longest move, in deg/s.
+            sync: Slow the other arm down so both arrive at the same time.
+            then: The action to take after each arm arrives.
+        """
+        run_task(
+            self.move_to_pose_async(
+                pose=pose,
+                left=left,
+                right=right,
+                speed=speed,
+                sync=sync,
+                then=then,
+            )
+        )
@@ -12,15 +12,19 @@ from pybricks.pupdevices import ColorSensor, Motor
 from pybricks.robotics import DriveBase
 from pybricks.hubs import PrimeHub
 from pybricks.parameters import Axis, Direction, Port
-from pybricks.tools import multitask, run_task, wait
+from pybricks.tools import StopWatch, multitask, run_task, wait
 
 import artemis_config
 import geometry
+import landmarks
+import line_follower
+import planner
+import profiling
+from odometry import Odometry
+from planner import Gear
 
-
-class Gear:
-    FWD = 'FWD'
-    REV = 'REV'
+# How often to check the progress of a move when actions are waiting on it.
+_PROGRESS_POLL_MS = 10
 
 
 def get_hub():
@@ -61,63 +65,220 @@ class ArtemisBase(DriveBase):
         self.motion = config.motion_config
         self.straight_control = config.straight_control_config
         self.turn_control = config.turn_control_config
+        self.profiles = config.profiles
+        self.contact = config.contact_config
+        # Watches the color sensors for lines, see `use_landmarks`.
+        self.relocalizer = None
+        # Whether the last straight crossed a known line.
+        self.relocalized = False
+        self.line_follower = line_follower.LineFollower(
+            self, config.line_config,
+        )
+        self.reconfigurations = 0
+        self.reconfigurations_skipped = 0
+        self.forget_profile()
         self.use_gyro(True)
+        # Where the robot should be: its commanded pose.
+        self.pose = geometry.Pose()
+        self.odometry = Odometry(
+            left_drive,
+            right_drive,
+            self.angle,
+            config.geometry_config.wheel_diameter,
+        )
         self.reset_position()
 
-    def _config_global(self):
-        self.settings(
-            straight_speed=self.motion.straight_speed,
-            straight_acceleration=self.motion.straight_acceleration,
-            turn_rate=self.motion.turn_rate,
-            turn_acceleration=self.motion.turn_acceleration,
+    def _use_profile(
+        self,
+        name: str,
+        straight_speed: float | None = None,
+        straight_acceleration: float | None = None,
+        turn_rate: float | None = None,
+        turn_acceleration=None,
+    ):
+        """Applies the control profile `name`, with optional overrides.
+
+        Only the settings that differ from what was last written are sent to
+        the drive base. If you change the settings or gains directly, call
+        `forget_profile` so they are all written again next time.
+        """
+        profile = self.profiles[name]
+        motion = profile.motion_config
+        control = profile.control_config
+        if straight_speed is None:
+            straight_speed = motion.straight_speed
+        if straight_acceleration is None:
+            straight_acceleration = motion.straight_acceleration
+        if turn_rate is None:
+            turn_rate = motion.turn_rate
+        if turn_acceleration is None:
+            turn_acceleration = motion.turn_acceleration
+
+        settings = (
+            straight_speed,
+            straight_acceleration,
+            turn_rate,
+            turn_acceleration,
         )
+        if settings != self._active_settings:
+            self.settings(
+                straight_speed=straight_speed,
+                straight_acceleration=straight_acceleration,
+                turn_rate=turn_rate,
+                turn_acceleration=turn_acceleration,
+            )
+            self._active_settings = settings
+            self.reconfigurations += 1
+        else:
+            self.reconfigurations_skipped += 1
+
+        pid = (control.kp, control.ki, control.kd)
+        if pid != self._active_pid:
+            self.heading_control.pid(kp=pid[0], ki=pid[1], kd=pid[2])
+            self._active_pid = pid
+            self.reconfigurations += 1
+        else:
+            self.reconfigurations_skipped += 1
+
+        heading = control.heading_tolerance
+        heading_tolerance = (heading.speed, heading.position)
+        if heading_tolerance != self._active_heading_tolerance:
+            self.heading_control.target_tolerances(
+                speed=heading.speed,
+                position=heading.position,
+            )
+            self._active_heading_tolerance = heading_tolerance
+            self.reconfigurations += 1
+        else:
+            self.reconfigurations_skipped += 1
+
+        distance = control.distance_tolerance
+        distance_tolerance = (distance.speed, distance.position)
+        if distance_tolerance != self._active_distance_tolerance:
+            self.distance_control.target_tolerances(
+                speed=distance.speed,
+                position=distance.position,
+            )
+            self._active_distance_tolerance = distance_tolerance
+            self.reconfigurations += 1
+        else:
+            self.reconfigurations_skipped += 1
+
+        self.active_profile = name
+
+    def forget_profile(self):
+        """Forgets the active profile, so the next move writes everything."""
+        self.active_profile = None
+        self._active_settings = None
+        self._active_pid = None
+        self._active_heading_tolerance = None
+        self._active_distance_tolerance = None
 
     def _configure_straight_control(self):
-        self._config_global()
-        self.heading_control.pid(
-            kp=self.straight_control.kp,
-            ki=self.straight_control.ki,
-            kd=self.straight_control.kd,
-        )
-        self.heading_control.target_tolerances(
-            speed=self.straight_control.heading_tolerance.speed,
-            position=self.straight_control.heading_tolerance.position,
-        )
-        self.distance_control.target_tolerances(
-            speed=self.straight_control.distance_tolerance.speed,
-            position=self.straight_control.distance_tolerance.position,
-        )
+        self._use_profile("straight")
 
     def _configure_turn_control(self):
-        self._config_global()
-        self.heading_control.pid(
-            kp=self.turn_control.kp,
-            ki=self.turn_control.ki,
-            kd=self.turn_control.kd,
-        )
-        self.heading_control.target_tolerances(
-            speed=self.turn_control.heading_tolerance.speed,
-            position=self.turn_control.heading_tolerance.position,
-        )
-        self.distance_control.target_tolerances(
-            speed=self.turn_control.distance_tolerance.speed,
-            position=self.turn_control.distance_tolerance.position,
-        )
+        self._use_profile("turn")
+
+    @property
+    def x(self) -> float:
+        return self.pose.x
+
+    @x.setter
+    def x(self, value: float):
+        self.pose.x = value
+
+    @property
+    def y(self) -> float:
+        return self.pose.y
+
+    @y.setter
+    def y(self, value: float):
+        self.pose.y = value
 
     def reset_position(
         self,
         x: float = 0,
         y: float = 0,
     ):
-        self.x = x
-        self.y = y
+        """Tells the robot where it is, resetting the odometry too."""
+        self.pose.set(x, y, self.angle())
+        self.odometry.reset(x, y)
+
+    def _set_position(
+        self,
+        x: float,
+        y: float,
+    ):
+        """Records where the robot should be after a move.
+
+        Unlike `reset_position`, this keeps the odometry's own estimate.
+        """
+        self.pose.set(x, y, self.angle())
+        self.odometry.update()
+
+    def use_landmarks(self, lines):
+        """Corrects the pose whenever a straight crosses one of `lines`.
+
+        Args:
+            lines: The `landmarks.Line`s on the mat, or None to stop.
+        """
+        if not lines:
+            self.relocalizer = None
+            return
+        self.relocalizer = landmarks.Relocalizer(
+            self.left_color,
+            self.right_color,
+            lines,
+            self.geometry.sensor_forward,
+            self.geometry.sensor_spacing,
+        )
+
+    def _relocalize(self) -> bool:
+        """Applies what the last straight learned from the lines it crossed.
+
+        Returns: True if it crossed a known line.
+        """
+        relocalizer = self.relocalizer
+        if relocalizer is None or not relocalizer.crossed:
+            return False
+        pose = self.pose
+        if relocalizer.heading is not None:
+            # Keep the distance; only the heading was off, so the whole
+            # straight went somewhere else than we thought.
+            self.reset(self.distance(), relocalizer.heading)
+            pose.heading = relocalizer.heading
+            pose.x, pose.y = relocalizer.position(self.distance())
+        else:
+            pose.x += relocalizer.dx
+            pose.y += relocalizer.dy
+        self.odometry.reset(pose.x, pose.y)
+        return True
+
+    def _arrive(
+        self,
+        x: float,
+        y: float,
+    ):
+        """Records that a straight to (x, y) is done.
+
+        Assumes the robot got there, unless it crossed a line on the way and
+        so knows better.
+        """
+        if not self.relocalized:
+            self._set_position(x, y)
+
+    def _update_heading(self):
+        """Records the heading after a turn, which doesn't move the robot."""
+        self.pose.heading = self.angle()
+        self.odometry.update()
 
     async def _straight_with_timeout(
         self,
         distance: float,
         timeout: float,
         then: Stop = Stop.HOLD,
-    ):        
+    ):
         await multitask(
             super().straight(
                 distance=distance,
@@ -127,6 +288,117 @@ class ArtemisBase(DriveBase):
             race=True,
         )
 
+    async def _with_actions(
+        self,
+        motion,
+        progress,
+        total: float,
+        during,
+    ):
+        """Awaits `motion`, starting the actions in `during` along the way.
+
+        Args:
+            motion: The awaitable move.
+            progress: Function returning how far the move has gotten so far.
+            total: The value of `progress()` when the move is complete.
+            during: Pairs of (fraction, action). `action` is called with no
+                arguments once `progress()` reaches `fraction * total`, and
+                the awaitable it returns runs alongside the rest of the move.
+                If the move ends early, remaining actions start right away.
+        """
+        finished = [False]
+
+        async def run_motion():
+            await motion
+            finished[0] = True
+
+        async def run_action(fraction, action):
+            while not finished[0] and progress() < fraction * total:
+                await wait(_PROGRESS_POLL_MS)
+            await action()
+
+        await multitask(
+            run_motion(),
+            *[run_action(fraction, action) for fraction, action in during],
+        )
+
+    def _in_contact(self) -> bool:
+        """Whether the drive is stalled or straining against something."""
+        load = self.contact.load
+        return (
+            self.stalled()
+            or abs(self.left_drive.load()) >= load
+            or abs(self.right_drive.load()) >= load
+        )
+
+    async def _until_contact(self):
+        """Returns once the robot has been in contact for `contact.time`."""
+        watch = StopWatch()
+        while True:
+            await wait(_PROGRESS_POLL_MS)
+            if not self._in_contact():
+                watch.reset()
+            elif watch.time() >= self.contact.time:
+                return
+
+    def _limit_torque(self, control):
+        """Limits `control` to `contact.torque`, if that is set.
+
+        Call this before starting the move, so the limit is in place from
+        the start.
+
+        Returns: the limits to restore after the move, or None.
+        """
+        torque = self.contact.torque
+        if torque is None:
+            return None
+        limits = control.limits()
+        control.limits(torque=torque)
+        return limits
+
+    async def _with_contact(self, motion, control, limits):
+        """Awaits `motion`, stopping it as soon as the robot makes contact.
+
+        Args:
+            motion: The awaitable move.
+            control: The drive base controller the move uses.
+            limits: What `_limit_torque` returned for `control`. They are
+                restored afterwards, even if the move is cancelled.
+        """
+        try:
+            await multitask(motion, self._until_contact(), race=True)
+        finally:
+            if limits is not None:
+                control.limits(*limits)
+
+    async def _watch_lines(self, motion):
+        """Awaits `motion`, checking the color sensors for lines meanwhile."""
+
+        async def watch():
+            while True:
+                self.relocalizer.update(self.distance())
+                await wait(_PROGRESS_POLL_MS)
+
+        await multitask(motion, watch(), race=True)
+
+    def _prepare_straight(
+        self,
+        speed: float | None,
+        acceleration: float | None,
+    ):
+        self._use_profile(
+            "straight",
+            straight_speed=speed,
+            straight_acceleration=acceleration,
+        )
+
+    def _update_position(self, distance: float):
+        heading = self.angle()
+        self.pose.advance(distance, heading)
+        self.pose.heading = heading
+        self.odometry.update()
+
+    @profiling.profile
     def straight(
         self,
         distance: float,
@@ -135,8 +407,13 @@ class ArtemisBase(DriveBase):
         speed: float | None = None,
         acceleration: float | None = None,
         timeout: float | None = None,
-    ):
+        during=(),
+        contact: bool = False,
+    ) -> float:
         """Drives straight for a given distance.
+
+        After `use_landmarks`, the color sensors are watched for lines on the
+        way, and the pose is corrected from the ones crossed.
         
         Args:
             distance: The distance to drive in millimeters.
@@ -146,33 +423,103 @@ class ArtemisBase(DriveBase):
             acceleration: Override the global acceleration setting.
             timeout: If set, the maximum time to allow for the movement
                 before stopping it, in milliseconds.
+            during: Pairs of (fraction, action) to run while driving. See
+                `straight_async`.
+            contact: Stop as soon as the robot pushes against something,
+                see `ContactConfig`.
+
+        Returns: the distance driven, less than `distance` if the move was
+          cut short by `timeout` or `contact`.
         """
-        self._configure_straight_control()
-        if speed is not None:
-            self.settings(straight_speed=speed)
-        if acceleration is not None:
-            self.settings(straight_acceleration=acceleration)
-        if timeout is not None:
-            run_task(
-                self._straight_with_timeout(
+        watch_lines = self.relocalizer is not None and wait
+        if timeout is not None or during or contact or watch_lines:
+            driven = [distance]
+
+            async def run_straight():
+                driven[0] = await self.straight_async(
                     distance=distance,
-                    timeout=timeout,
                     then=then,
+                    speed=speed,
+                    acceleration=acceleration,
+                    timeout=timeout,
+                    during=during,
+                    contact=contact,
                 )
+
+            run_task(run_straight())
+            return driven[0]
+        self._prepare_straight(speed, acceleration)
+        super().straight(
+            distance=distance,
+            then=then,
+            wait=wait,
+        )
+        self._update_position(distance)
+        self.relocalized = False
+        return distance
+
+    async def straight_async(
+        self,
+        distance: float,
+        then: Stop = Stop.HOLD,
+        speed: float | None = None,
+        acceleration: float | None = None,
+        timeout: float | None = None,
+        during=(),
+        contact: bool = False,
+    ) -> float:
+        """Awaitable version of `straight`.
+
+        Args:
+            distance: The distance to drive in millimeters.
+            then: The action to take after driving.
+            speed: Override the global speed setting.
+            acceleration: Override the global acceleration setting.
+            timeout: If set, the maximum time to allow for the movement
+                before stopping it, in milliseconds.
+            during: Pairs of (fraction, action). Each action is called with
+                no arguments once the robot has covered `fraction` of
+                `distance`, for example
+                `(0.5, lambda: attachment.left_arm_move(200, 100))`.
+            contact: Stop as soon as the robot pushes against something,
+                see `ContactConfig`.
+
+        Returns: the distance driven.
+        """
+        self._prepare_straight(speed, acceleration)
+        start = self.distance()
+        if contact:
+            limits = self._limit_torque(self.distance_control)
+        if timeout is not None:
+            motion = self._straight_with_timeout(
+                distance=distance,
+                timeout=timeout,
+                then=then,
             )
         else:
-            super().straight(
+            motion = super().straight(
                 distance=distance,
                 then=then,
-                wait=wait,
             )
-        new_x, new_y = geometry.compute_new_position(
-            self.x,
-            self.y,
-            self.angle(),
-            distance,
+        if contact:
+            motion = self._with_contact(
+                motion, self.distance_control, limits,
+            )
+        if self.relocalizer is not None:
+            self.relocalizer.start(self.pose, start)
+            motion = self._watch_lines(motion)
+        await self._with_actions(
+            motion,
+            lambda: abs(self.distance() - start),
+            abs(distance),
+            during,
         )
-        self.reset_position(new_x, new_y)
+        if timeout is not None or contact:
+            # The move may have been cut short, so use how far we really went.
+            distance = self.distance() - start
+        self._update_position(distance)
+        self.relocalized = self._relocalize()
+        return distance
 
     async def _turn_with_timeout(
         self,
@@ -189,6 +536,21 @@ class ArtemisBase(DriveBase):
             race=True,
         )
 
+    def _prepare_turn(
+        self,
+        heading: float,
+        speed: float | None,
+        acceleration: float | None,
+    ) -> float:
+        """Configures the turn controller and returns the angle to turn."""
+        self._use_profile(
+            "turn",
+            turn_rate=speed,
+            turn_acceleration=acceleration,
+        )
+        return geometry.compute_turn(self.angle(), heading)
+
+    @profiling.profile
     def turn_to(
         self,
         heading: float,
@@ -197,6 +559,8 @@ class ArtemisBase(DriveBase):
         speed: float | None = None,
         acceleration: float | None = None,
         timeout: float | None = None,
+        during=(),
+        contact: bool = False,
     ):
         """Turns the robot to face in the direction `heading`.
 
@@ -208,16 +572,25 @@ class ArtemisBase(DriveBase):
             acceleration: Override the global turn acceleration setting.
             timeout: If set, the maximum time to allow for the movement
                 before stopping it, in milliseconds.
+            during: Pairs of (fraction, action) to run while turning. See
+                `straight_async`.
+            contact: Stop as soon as the robot pushes against something,
+                see `ContactConfig`.
         """
-        self._configure_turn_control()
-        if speed is not None:
-            self.settings(turn_rate=speed)
-        if acceleration is not None:
-            self.settings(turn_acceleration=acceleration)
-        current_heading = self.angle()
-        turn = (heading - current_heading) % 360
-        if turn > 180:
-            turn = turn - 360
+        if during or contact:
+            run_task(
+                self.turn_to_async(
+                    heading=heading,
+                    then=then,
+                    speed=speed,
+                    acceleration=acceleration,
+                    timeout=timeout,
+                    during=during,
+                    contact=contact,
+                )
+            )
+            return
+        turn = self._prepare_turn(heading, speed, acceleration)
         if timeout is not None:
             run_task(
                 self._turn_with_timeout(
@@ -228,7 +601,58 @@ class ArtemisBase(DriveBase):
             )
         else:
             self.turn(turn, then, wait)
+        self._update_heading()
+
+    async def turn_to_async(
+        self,
+        heading: float,
+        then: Stop = Stop.HOLD,
+        speed: float | None = None,
+        acceleration: float | None = None,
+        timeout: float | None = None,
+        during=(),
+        contact: bool = False,
+    ):
+        """Awaitable version of `turn_to`.
+
+        Args:
+            heading: The heading to turn to in degrees.
+            then: The action to take after turning.
+            speed: Override the global turn speed setting.
+            acceleration: Override the global turn acceleration setting.
+            timeout: If set, the maximum time to allow for the movement
+                before stopping it, in milliseconds.
+            during: Pairs of (fraction, action). Each action is called with
+                no arguments once the robot has turned through `fraction` of
+                the turn.
+            contact: Stop as soon as the robot pushes against something,
+                see `ContactConfig`.
+        """
+        turn = self._prepare_turn(heading, speed, acceleration)
+        start = self.angle()
+        if contact:
+            limits = self._limit_torque(self.heading_control)
+        if timeout is not None:
+            motion = self._turn_with_timeout(
+                angle=turn,
+                timeout=timeout,
+                then=then,
+            )
+        else:
+            motion = self.turn(turn, then)
+        if contact:
+            motion = self._with_contact(
+                motion, self.heading_control, limits,
+            )
+        await self._with_actions(
+            motion,
+            lambda: abs(self.angle() - start),
+            abs(turn),
+            during,
+        )
+        self._update_heading()
 
+    @profiling.profile
     def drive_to(
         self,
         x: float,
@@ -237,8 +661,16 @@ class ArtemisBase(DriveBase):
         wait: bool = True,
         gear: Gear = Gear.FWD,
         timeout: float | None = None,
+        during=(),
+        contact: bool = False,
     ):
-        """Drives from the current location to (x, y)."""
+        """Drives from the current location to (x, y).
+
+        Actions in `during` are started relative to the straight part of the
+        move, see `straight_async`. With `contact`, the straight part stops
+        as soon as the robot pushes against something, and the robot is where
+        it stopped rather than at (x, y).
+        """
         heading, distance = geometry.compute_trajectory(
             self.x, self.y, x, y,
         )
@@ -246,10 +678,444 @@ class ArtemisBase(DriveBase):
             heading += 180
             distance = -distance
         self.turn_to(heading, timeout=timeout)
-        self.straight(distance, then=then, wait=wait, timeout=timeout)
-        # Assume we've arrived at the destination rather than using the
-        # computation from `straight`.
-        self.reset_position(x, y)
+        self.straight(
+            distance,
+            then=then,
+            wait=wait,
+            timeout=timeout,
+            during=during,
+            contact=contact,
+        )
+        if not contact:
+            # Assume we've arrived at the destination rather than using the
+            # computation from `straight`.
+            self._arrive(x, y)
+
+    async def drive_to_async(
+        self,
+        x: float,
+        y: float,
+        then: Stop = Stop.HOLD,
+        gear: Gear = Gear.FWD,
+        timeout: float | None = None,
+        during=(),
+        contact: bool = False,
+    ):
+        """Awaitable version of `drive_to`.
+
+        Actions in `during` are started relative to the straight part of the
+        move, see `straight_async`. With `contact`, the straight part stops
+        as soon as the robot pushes against something, and the robot is where
+        it stopped rather than at (x, y).
+        """
+        heading, distance = geometry.compute_trajectory(
+            self.x, self.y, x, y,
+        )
+        if gear == Gear.REV:
+            heading += 180
+            distance = -distance
+        await self.turn_to_async(heading, timeout=timeout)
+        await self.straight_async(
+            distance,
+            then=then,
+            timeout=timeout,
+            during=during,
+            contact=contact,
+        )
+        if not contact:
+            # Assume we've arrived at the destination rather than using the
+            # computation from `straight`.
+            self._arrive(x, y)
+
+    @profiling.profile
+    def follow(
+        self,
+        commands: list,
+        then: Stop = Stop.HOLD,
+        blend: bool = False,
+    ):
+        """Runs a list of commands from `planner.compile_route`.
+
+        Args:
+            commands: The commands to run.
+            then: The action to take after the last command.
+            blend: If True, every command but the last ends with `Stop.NONE`
+                so the robot carries its speed into the next one instead of
+                settling. The controllers are configured once up front,
+                because they can't be changed while the robot is moving.
+        """
+        if blend:
+            self._configure_straight_control()
+        heading = self.angle()
+        last = len(commands) - 1
+        for i, command in enumerate(commands):
+            if i == last:
+                command_then = then
+            elif blend:
+                command_then = Stop.NONE
+            else:
+                command_then = Stop.HOLD
+            if command[0] == planner.TURN:
+                if blend:
+                    # Relative moves continue from where the previous one was
+                    # headed, so turn relative to the planned heading.
+                    self.turn(
+                        geometry.compute_turn(heading, command[1]),
+                        then=command_then,
+                    )
+                    self._update_heading()
+                else:
+                    self.turn_to(command[1], then=command_then)
+                heading = command[1]
+            elif command[0] == planner.STRAIGHT:
+                if blend:
+                    super().straight(command[1], then=command_then)
+                    self._set_position(command[2], command[3])
+                else:
+                    self.straight(command[1], then=command_then)
+                    self._arrive(command[2], command[3])
+
+    @profiling.profile
+    def follow_line(
+        self,
+        speed: float | None = None,
+        distance: float | None = None,
+        sensor: str = line_follower.BOTH,
+        edge: str = line_follower.RIGHT,
+        junction: bool = False,
+        color=None,
+        then: Stop = Stop.HOLD,
+    ) -> str:
+        """Follows a line with the color sensors, see `line_follower`.
+
+        Returns: why following stopped, `line_follower.DISTANCE`, `JUNCTION`
+          or `COLOR`.
+        """
+        reason = [None]
+
+        async def run_follow_line():
+            reason[0] = await self.follow_line_async(
+                speed=speed,
+                distance=distance,
+                sensor=sensor,
+                edge=edge,
+                junction=junction,
+                color=color,
+                then=then,
+            )
+
+        run_task(run_follow_line())
+        return reason[0]
+
+    async def follow_line_async(
+        self,
+        speed: float | None = None,
+        distance: float | None = None,
+        sensor: str = line_follower.BOTH,
+        edge: str = line_follower.RIGHT,
+        junction: bool = False,
+        color=None,
+        then: Stop = Stop.HOLD,
+    ) -> str:
+        """Awaitable version of `follow_line`.
+
+        Args:
+            speed: The driving speed in mm/s, or None for the configured one.
+            distance: If set, stop after driving this far, in millimeters.
+            sensor: `line_follower.LEFT` or `RIGHT` to follow with one
+                sensor, `BOTH` to follow with both.
+            edge: With one sensor, the edge of the line to follow.
+            junction: Stop when the other sensor, or both sensors, are over
+                the line.
+            color: If set, stop when a sensor that isn't following sees this
+                `Color`.
+            then: The action to take at the end. `Stop.NONE` leaves the
+                robot driving into the next move.
+
+        Returns: why following stopped.
+        """
+        # The path isn't straight, so the odometry tracks it as it goes, in
+        # its own task to keep the follower's loop lean.
+        self.odometry.update()
+        x, y = self.odometry.x, self.odometry.y
+        results = await multitask(
+            self.line_follower.follow(
+                speed=speed,
+                distance=distance,
+                sensor=sensor,
+                edge=edge,
+                junction=junction,
+                color=color,
+            ),
+            self.odometry.run(),
+            race=True,
+        )
+        reason = results[0]
+        if then == Stop.COAST:
+            self.stop()
+        elif then == Stop.BRAKE:
+            self.brake()
+        elif then != Stop.NONE:
+            # The drive base can't hold, so hold each wheel where it is.
+            self.left_drive.hold()
+            self.right_drive.hold()
+        self.odometry.update()
+        self.pose.x += self.odometry.x - x
+        self.pose.y += self.odometry.y - y
+        self.pose.heading = self.angle()
+        return reason
+
+    @profiling.profile
+    def drive_route(
+        self,
+        waypoints: list,
+        then: Stop = Stop.HOLD,
+    ):
+        """Drives through `waypoints` in order, picking the gear for each leg.
+
+        Unlike calling `drive_to` for each waypoint, legs may be driven in
+        reverse to save rotation, and turns within the turn controller's
+        heading tolerance are skipped. See `planner.compile_route`.
+        """
+        commands = planner.compile_route(
+            self.x,
+            self.y,
+            self.angle(),
+            waypoints,
+            heading_tolerance=self.turn_control.heading_tolerance.position,
+            min_distance=self.straight_control.distance_tolerance.position,
+        )
+        self.follow(commands, then=then)
+
+    @profiling.profile
+    def drive_through(
+        self,
+        waypoints: list,
+        then: Stop = Stop.HOLD,
+    ):
+        """Drives through `waypoints` without stopping at the intermediate ones.
+
+        The route is planned like `drive_route`, but only the final waypoint
+        ends with `then`; the robot rolls through the others.
+        """
+        commands = planner.compile_route(
+            self.x,
+            self.y,
+            self.angle(),
+            waypoints,
+            heading_tolerance=self.turn_control.heading_tolerance.position,
+            min_distance=self.straight_control.distance_tolerance.position,
+        )
+        self.follow(commands, then=then, blend=True)
+
+    @profiling.profile
+    def run_table(
+        self,
+        table,
+        attachment=None,
+    ):
+        """Runs a command table, like those from `mission_compiler`.
+
+        Args:
+            table: The commands to run, see `planner` for the op codes.
+            attachment: The attachment that runs LEFT_ARM, RIGHT_ARM and
+                ARMS commands.
+        """
+        # Look the methods up once rather than on every command.
+        turn_to = self.turn_to
+        straight = self.straight
+        arrive = self._arrive
+        for command in table:
+            op = command[0]
+            if op == planner.STRAIGHT:
+                if len(command) > 4:
+                    straight(
+                        command[1],
+                        speed=command[4],
+                        acceleration=command[5],
+                    )
+                else:
+                    straight(command[1])
+                arrive(command[2], command[3])
+            elif op == planner.CONTACT:
+                if len(command) > 4:
+                    straight(
+                        command[1],
+                        speed=command[4],
+                        acceleration=command[5],
+                        contact=True,
+                    )
+                else:
+                    straight(command[1], contact=True)
+            elif op == planner.TURN:
+                if len(command) > 2:
+                    turn_to(
+                        command[1],
+                        speed=command[2],
+                        acceleration=command[3],
+                    )
+                else:
+                    turn_to(command[1])
+            elif op == planner.LEFT_ARM:
+                attachment.left_arm_move(command[1], command[2])
+            elif op == planner.RIGHT_ARM:
+                attachment.right_arm_move(command[1], command[2])
+            elif op == planner.ARMS:
+                attachment.move_to_pose(
+                    left=command[2],
+                    right=command[3],
+                    speed=command[1],
+                )
+            elif op == planner.WAIT:
+                wait(command[1])
+            elif op == planner.RESET:
+                self.reset_position(command[1], command[2])
+            else:
+                raise ValueError("Unknown op code: " + str(op))
+
+    async def run_table_async(
+        self,
+        table,
+        attachment=None,
+    ):
+        """Awaitable version of `run_table`, so that it can be cut short."""
+        arrive = self._arrive
+        for command in table:
+            op = command[0]
+            if op == planner.STRAIGHT:
+                if len(command) > 4:
+                    await self.straight_async(
+                        command[1],
+                        speed=command[4],
+                        acceleration=command[5],
+                    )
+                else:
+                    await self.straight_async(command[1])
+                arrive(command[2], command[3])
+            elif op == planner.CONTACT:
+                if len(command) > 4:
+                    await self.straight_async(
+                        command[1],
+                        speed=command[4],
+                        acceleration=command[5],
+                        contact=True,
+                    )
+                else:
+                    await self.straight_async(command[1], contact=True)
+            elif op == planner.TURN:
+                if len(command) > 2:
+                    await self.turn_to_async(
+                        command[1],
+                        speed=command[2],
+                        acceleration=command[3],
+                    )
+                else:
+                    await self.turn_to_async(command[1])
+            elif op == planner.LEFT_ARM:
+                await attachment.left_arm_move(command[1], command[2])
+            elif op == planner.RIGHT_ARM:
+                await attachment.right_arm_move(command[1], command[2])
+            elif op == planner.ARMS:
+                await attachment.move_to_pose_async(
+                    left=command[2],
+                    right=command[3],
+                    speed=command[1],
+                )
+            elif op == planner.WAIT:
+                await wait(command[1])
+            elif op == planner.RESET:
+                self.reset_position(command[1], command[2])
+            else:
+                raise ValueError("Unknown op code: " + str(op))
+
+    def _curve(
+        self,
+        turn: float,
+        radius: float,
+        then: Stop = Stop.HOLD,
+    ):
+        """Drives forward along an arc, changing the heading by `turn`.
+
+        Returns: what `curve` returns, an awaitable inside `run_task`.
+        """
+        # The sign of the radius picks the side of the circle's center
+        # (positive is right) and a positive angle drives forward.
+        side = 1 if turn > 0 else -1
+        return self.curve(side * radius, abs(turn), then=then)
+
+    async def _drive_segments(
+        self,
+        segments,
+        radius: float,
+        then: Stop,
+    ):
+        """Drives the (turn, length) segments of `arc_to`, blended."""
+        pose = self.pose
+        last = len(segments) - 1
+        for i, (turn, length) in enumerate(segments):
+            segment_then = then if i == last else Stop.NONE
+            if turn == 0:
+                await super().straight(length, then=segment_then)
+                pose.advance(length)
+            else:
+                await self._curve(turn, radius, then=segment_then)
+                pose.arc(radius, turn)
+
+    @profiling.profile
+    def arc_to(
+        self,
+        x: float,
+        y: float,
+        heading: float | None = None,
+        then: Stop = Stop.HOLD,
+        radius: float | None = None,
+    ):
+        """Drives to (x, y) along arcs and straight lines.
+
+        Instead of turning in place, the robot curves onto the new heading,
+        keeping its speed through changes of direction.
+
+        Args:
+            x: The x position to drive to.
+            y: The y position to drive to.
+            heading: If set, the heading to arrive with. Otherwise the robot
+                arrives facing along the final straight line.
+            then: The action to take after the last segment.
+            radius: Override the minimum turning radius from the config.
+                Never less than half the axle track.
+        """
+        if radius is None:
+            radius = self.motion.min_turn_radius
+        radius = max(radius, self.geometry.axle_track / 2)
+        pose = self.pose
+        pose.heading = self.angle()
+        if heading is None:
+            segments = geometry.compute_arc_to_point(
+                pose.x, pose.y, pose.heading, x, y, radius,
+            )
+        else:
+            segments = geometry.compute_dubins_path(
+                pose.x, pose.y, pose.heading, x, y, heading, radius,
+            )
+        if not segments:
+            # Too close to reach with this radius.
+            self.drive_to(x, y, then=then)
+            if heading is not None:
+                self.turn_to(heading, then=then)
+            return
+
+        # Segments blend into each other, so configure the controllers once.
+        self._configure_straight_control()
+        # Sample the odometry all along the curves, not just at their ends.
+        run_task(
+            multitask(
+                self._drive_segments(segments, radius, then),
+                self.odometry.run(),
+                race=True,
+            )
+        )
+        self.odometry.update()
+        self._set_position(x, y)
 
     @classmethod
     def default(cls) -> tuple[PrimeHub, "ArtemisBase"]:
@@ -46,18 +46,22 @@ class MotionConfig:
         straight_acceleration: float,
         turn_rate: float,
         turn_acceleration,  # float or tuple[float, float]
+        min_turn_radius: float = 0,
     ):
         self.straight_speed = straight_speed
         self.straight_acceleration = straight_acceleration
         self.turn_rate = turn_rate
         self.turn_acceleration = turn_acceleration
+        # Smallest radius for arcs, never less than half the axle track.
+        self.min_turn_radius = min_turn_radius
 
     def __repr__(self):
         return (
             f"MotionConfig(straight_speed={self.straight_speed}, " +
             f"straight_acceleration={self.straight_acceleration}, " +
             f"turn_rate={self.turn_rate}, " +
-            f"turn_acceleration={self.turn_acceleration})"
+            f"turn_acceleration={self.turn_acceleration}, " +
+            f"min_turn_radius={self.min_turn_radius})"
         )
 
 class GeometryConfig:
@@ -65,14 +69,22 @@ class GeometryConfig:
         self,
         wheel_diameter: float,
         axle_track: float,
+        sensor_forward: float = 0,
+        sensor_spacing: float = 0,
     ):
         self.wheel_diameter = wheel_diameter
         self.axle_track = axle_track
+        # Where the color sensors are: how far ahead of the middle of the
+        # axle, and how far apart.
+        self.sensor_forward = sensor_forward
+        self.sensor_spacing = sensor_spacing
 
     def __repr__(self):
         return (
             f"GeometryConfig(wheel_diameter={self.wheel_diameter}, " +
-            f"axle_track={self.axle_track})"
+            f"axle_track={self.axle_track}, " +
+            f"sensor_forward={self.sensor_forward}, " +
+            f"sensor_spacing={self.sensor_spacing})"
         )
 
 class ToleranceConfig:
@@ -91,6 +103,79 @@ class ToleranceConfig:
         )
 
 
+class ContactConfig:
+    """When a contact move decides the robot has hit something."""
+
+    def __init__(
+        self,
+        load: float,
+        time: float,
+        torque: float | None = None,
+    ):
+        # Drive motor load in mNm that counts as pushing against something.
+        self.load = load
+        # How long the load or a stall must last to count, in milliseconds.
+        self.time = time
+        # If set, the most torque in mNm the drive may use during a contact
+        # move, like the duty limit of `Motor.run_until_stalled`.
+        self.torque = torque
+
+    def __repr__(self):
+        return (
+            f"ContactConfig(load={self.load}, time={self.time}, " +
+            f"torque={self.torque})"
+        )
+
+
+class LineConfig:
+    """Settings for following a line with the color sensors."""
+
+    def __init__(
+        self,
+        speed: float,
+        gain: float,
+        max_turn_rate: float,
+        black: float,
+        white: float,
+    ):
+        # Driving speed in mm/s.
+        self.speed = speed
+        # Turn rate in deg/s per percent of reflection off the line's edge.
+        self.gain = gain
+        self.max_turn_rate = max_turn_rate
+        # Reflection in percent seen over the line and over the mat.
+        self.black = black
+        self.white = white
+
+    def __repr__(self):
+        return (
+            f"LineConfig(speed={self.speed}, gain={self.gain}, " +
+            f"max_turn_rate={self.max_turn_rate}, " +
+            f"black={self.black}, white={self.white})"
+        )
+
+
+class ControlProfile:
+    """The drive settings and controller gains used for one kind of move."""
+
+    def __init__(
+        self,
+        name: str,
+        motion_config: MotionConfig,
+        control_config: ControlConfig,
+    ):
+        self.name = name
+        self.motion_config = motion_config
+        self.control_config = control_config
+
+    def __repr__(self):
+        return (
+            f"ControlProfile(name={self.name!r}, " +
+            f"motion_config={self.motion_config}, " +
+            f"control_config={self.control_config})"
+        )
+
+
 class ArtemisConfig:
     def __init__(
         self,
@@ -98,11 +183,34 @@ class ArtemisConfig:
         motion_config: MotionConfig,
         straight_control_config: ControlConfig,
         turn_control_config: ControlConfig,
+        contact_config: ContactConfig | None = None,
+        line_config: LineConfig | None = None,
     ):
         self.geometry_config = geometry_config
         self.motion_config = motion_config
         self.straight_control_config = straight_control_config
         self.turn_control_config = turn_control_config
+        if contact_config is None:
+            contact_config = ContactConfig(load=200, time=100)
+        self.contact_config = contact_config
+        if line_config is None:
+            line_config = LineConfig(
+                speed=250,
+                gain=4,
+                max_turn_rate=180,
+                black=10,
+                white=90,
+            )
+        self.line_config = line_config
+        # More profiles can be added here by name.
+        self.profiles = {
+            "straight": ControlProfile(
+                "straight", motion_config, straight_control_config,
+            ),
+            "turn": ControlProfile(
+                "turn", motion_config, turn_control_config,
+            ),
+        }
 
     @classmethod
     def default(cls):
@@ -110,12 +218,15 @@ class ArtemisConfig:
             geometry_config=GeometryConfig(
                 wheel_diameter=63,
                 axle_track=81,
+                sensor_forward=72,
+                sensor_spacing=64,
             ),
             motion_config=MotionConfig(
                 straight_speed=350,
                 straight_acceleration=800,
                 turn_rate=100,
-                turn_acceleration=(750, 200)
+                turn_acceleration=(750, 200),
+                min_turn_radius=100,
             ),
             straight_control_config=ControlConfig(
                 kp=18_500,
@@ -150,5 +261,7 @@ class ArtemisConfig:
             f"ArtemisConfig(geometry_config={self.geometry_config}, " +
             f"motion_config={self.motion_config}, " +
             f"straight_control_config={self.straight_control_config}, " +
-            f"turn_control_config={self.turn_control_config})"
+            f"turn_control_config={self.turn_control_config}, " +
+            f"contact_config={self.contact_config}, " +
+            f"line_config={self.line_config})"
         )
\ No newline at end of file
@@ -1,8 +1,10 @@
 from pybricks.hubs import PrimeHub
 from pybricks.tools import wait
 
+import profiling
 from alpha import AttachmentAlpha
 from artemis_base_v2 import ArtemisBase, Gear
+from mission_runner import MATCH_MS, MissionRunner
 
 WEST_START = dict(
     x=359,
@@ -15,6 +17,7 @@ def init() -> tuple[PrimeHub, ArtemisBase, AttachmentAlpha]:
     attachment = AttachmentAlpha(
         left_motor=robot.left_attachment,
         right_motor=robot.right_attachment,
+        hub=hub,
     )
     robot.reset_position(**WEST_START)
     attachment.init()
@@ -22,6 +25,7 @@ def init() -> tuple[PrimeHub, ArtemisBase, AttachmentAlpha]:
 
 
 class SurfaceBrushing:
+    budget = 4_500
     start = WEST_START
     forward_point = dict(x=WEST_START["x"], y=800)
     end = dict(x=WEST_START["x"], y=600)
@@ -40,6 +44,7 @@ class SurfaceBrushing:
 
 
 class MapReveal:
+    budget = 10_500
     start = dict(x=498, y=796)
     soil_heading = -43
     left_arm_speed = 200
@@ -58,13 +63,10 @@ class MapReveal:
     ) -> None:
         robot.drive_to(**self.start)
         robot.turn_to(self.soil_heading)
-        attachment.left_arm_move(
-            speed=self.left_arm_speed,
-            position=self.left_arm_positions[0],
-        )
-        attachment.right_arm_move(
-            speed=self.right_arm_speed,
-            position=self.right_arm_positions[0],
+        attachment.move_to_pose(
+            left=self.left_arm_positions[0],
+            right=self.right_arm_positions[0],
+            speed=max(self.left_arm_speed, self.right_arm_speed),
         )
         robot.straight(
             self.step_sizes[0],
@@ -95,6 +97,7 @@ class MapReveal:
 
 
 class Mineshaft:
+    budget = 7_500
     start = dict(x=550, y=915)
     lift_location = dict(x=620, y=915)
     arm_speed = 200
@@ -125,10 +128,10 @@ class Mineshaft:
 
 
 class Statue:
+    budget = 6_500
     start = dict(x=759, y=824)
     lift_heading = 152
     forward_distance = 70
-    wait_time = 200
     arm_speed = 200
     left_arm_positions = [100, 40, 20]
     right_arm_positions = [20, 60]
@@ -142,31 +145,50 @@ class Statue:
     ) -> None:
         robot.drive_to(**self.start)
         robot.turn_to(self.lift_heading)
-        attachment.left_arm_move(
+        attachment.move_to_pose(
+            left=self.left_arm_positions[0],
             speed=self.arm_speed,
-            position=self.left_arm_positions[0],
         )
         robot.straight(self.forward_distance)
-        attachment.left_arm_move(
+        attachment.move_to_pose(
+            left=self.left_arm_positions[1],
             speed=self.arm_speed,
-            position=self.left_arm_positions[1],
         )
-        wait(self.wait_time)
         robot.turn_to(self.twist_heading)
-        wait(self.wait_time)
-        attachment.left_arm_move(
+        attachment.move_to_pose(
+            left=self.left_arm_positions[2],
+            right=self.right_arm_positions[0],
             speed=self.arm_speed,
-            position=self.left_arm_positions[2],
         )
-        wait(self.wait_time)
-        attachment.right_arm_move(
+        robot.straight(-self.backward_distance)
+
+    async def run_async(
+        self,
+        robot: ArtemisBase,
+        attachment: AttachmentAlpha,
+    ) -> None:
+        # The same as `run`, but the runner can stop it if the statue jams.
+        await robot.drive_to_async(**self.start)
+        await robot.turn_to_async(self.lift_heading)
+        await attachment.move_to_pose_async(
+            left=self.left_arm_positions[0],
             speed=self.arm_speed,
-            position=self.right_arm_positions[0],
         )
-        wait(self.wait_time)
-        robot.straight(-self.backward_distance)
+        await robot.straight_async(self.forward_distance)
+        await attachment.move_to_pose_async(
+            left=self.left_arm_positions[1],
+            speed=self.arm_speed,
+        )
+        await robot.turn_to_async(self.twist_heading)
+        await attachment.move_to_pose_async(
+            left=self.left_arm_positions[2],
+            right=self.right_arm_positions[0],
+            speed=self.arm_speed,
+        )
+        await robot.straight_async(-self.backward_distance)
 
 class GoHome:
+    budget = 4_500
     positions = [
         dict(x=380, y=220),
     ]
@@ -182,8 +204,15 @@ class GoHome:
 
 if __name__ == "__main__":
     hub, robot, attachment = init()
-    SurfaceBrushing().run(robot, attachment)
-    MapReveal().run(robot, attachment)
-    Mineshaft().run(robot, attachment)
-    Statue().run(robot, attachment)
-    GoHome().run(robot, attachment)
+    profiling.enable(robot)
+    runner = MissionRunner(robot, attachment, match_budget=MATCH_MS)
+    runner.run(
+        [
+            SurfaceBrushing(),
+            MapReveal(),
+            Mineshaft(),
+            Statue(),
+            GoHome(),
+        ]
+    )
+    profiling.dump(binary=True)
@@ -1,11 +1,16 @@
 """FakeArtemisBase: A mock version of ArtemisBase for testing purposes."""
 
+import array
+import csv
 import functools
 import inspect
 import math
 import sys
 from unittest import mock
 
+import artemis_config
+import kinematics
+
 try:
     import rich
     import rich.table
@@ -25,26 +30,198 @@ patches = {"umath": math}
 
 with mock.patch.dict(sys.modules, patches):
     import geometry
+    import planner
+
+
+class ActionLog:
+    """Columnar store for the calls logged by `log`.
+
+    Each call adds one row. Method names are stored as ids into `methods`,
+    and the durations and numeric state are stored in `array` columns, so
+    long simulated runs stay cheap to log. The state columns are the public
+    attributes the object had when the first call was logged.
+
+    Arguments are stored by method: `params[method_id]` has one column per
+    name in `param_names[method_id]`, and `param_row` gives each row's place
+    in the columns of its method.
+    """
+
+    __slots__ = (
+        "methods",
+        "_method_ids",
+        "method",
+        "duration",
+        "param_names",
+        "params",
+        "param_row",
+        "state_names",
+        "state",
+    )
+
+    def __init__(self):
+        self.methods = []
+        self._method_ids = {}
+        self.method = array.array("H")
+        self.duration = array.array("d")
+        self.param_names = []
+        self.params = []
+        self.param_row = array.array("I")
+        self.state_names = None
+        self.state = None
+
+    def append(
+        self,
+        method: str,
+        names: tuple,
+        values: list,
+        duration: float,
+        obj,
+    ):
+        """Logs one call.
+
+        Args:
+            method: The name of the method called.
+            names: The names of its parameters, the same on every call.
+            values: The value of each parameter, in the order of `names`.
+            duration: How long the call took, in milliseconds.
+            obj: The object called, whose public attributes are logged.
+        """
+        method_id = self._method_ids.get(method)
+        if method_id is None:
+            method_id = len(self.methods)
+            self.methods.append(method)
+            self._method_ids[method] = method_id
+            self.param_names.append(names)
+            self.params.append([[] for _ in names])
+        if self.state_names is None:
+            self.state_names = [
+                key for key in obj.__dict__ if not key.startswith("_")
+            ]
+            self.state = [
+                array.array("d")
+                if isinstance(getattr(obj, key), (int, float))
+                else []
+                for key in self.state_names
+            ]
+        self.method.append(method_id)
+        self.duration.append(duration)
+        columns = self.params[method_id]
+        self.param_row.append(len(columns[0]) if columns else 0)
+        for column, value in zip(columns, values, strict=True):
+            column.append(value)
+        for key, column in zip(self.state_names, self.state, strict=True):
+            column.append(getattr(obj, key))
+
+    def __len__(self):
+        return len(self.method)
+
+    def _params(self, i: int) -> dict:
+        """The arguments of row `i`, by name."""
+        method_id = self.method[i]
+        j = self.param_row[i]
+        return {
+            name: column[j]
+            for name, column in zip(
+                self.param_names[method_id],
+                self.params[method_id],
+                strict=True,
+            )
+        }
+
+    def __getitem__(self, i: int) -> dict:
+        """Row `i` as a dict, like the entries of the old list log."""
+        entry = {
+            "method": self.methods[self.method[i]],
+            "params": self._params(i),
+            "duration": self.duration[i],
+        }
+        for key, column in zip(self.state_names, self.state, strict=True):
+            entry[key] = column[i]
+        return entry
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def headers(self) -> list[str]:
+        if not self:
+            return []
+        return ["method", "params", "duration"] + self.state_names
+
+    def row(self, i: int) -> list[str]:
+        """Row `i` formatted as strings for a table."""
+        params = ", ".join(f"{k}={v}" for k, v in self._params(i).items())
+        row = [self.methods[self.method[i]], params, f"{self.duration[i]:g}"]
+        for column in self.state:
+            row.append(str(column[i]))
+        return row
+
+    def to_numpy(self) -> dict:
+        """The columns as NumPy arrays, by name."""
+        import numpy as np
+
+        if not self:
+            return {}
+        columns = {
+            "method": np.asarray(self.methods, dtype=object)[
+                np.frombuffer(self.method, dtype=np.uint16)
+            ],
+            "duration": np.frombuffer(self.duration, dtype=np.float64).copy(),
+        }
+        for key, column in zip(self.state_names, self.state, strict=True):
+            if isinstance(column, array.array):
+                columns[key] = np.frombuffer(column, dtype=np.float64).copy()
+            else:
+                columns[key] = np.asarray(column, dtype=object)
+        return columns
+
+    def params_of(self, method: str) -> dict:
+        """The arguments of every call to `method`, as NumPy arrays by name."""
+        import numpy as np
+
+        method_id = self._method_ids.get(method)
+        if method_id is None:
+            return {}
+        return {
+            name: np.asarray(column)
+            for name, column in zip(
+                self.param_names[method_id],
+                self.params[method_id],
+                strict=True,
+            )
+        }
+
+    def to_csv(self, path):
+        """Writes the log to `path` as CSV."""
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(self.headers())
+            for i in range(len(self)):
+                writer.writerow(self.row(i))
 
 
 def log(method):
+    # Binding arguments with `inspect` is slow, so look at the signature once
+    # and bind by hand on each call.
+    parameters = list(inspect.signature(method).parameters.values())[1:]
+    names = tuple(parameter.name for parameter in parameters)
+    defaults = tuple(
+        None if parameter.default is inspect.Parameter.empty
+        else parameter.default
+        for parameter in parameters
+    )
+    positions = {name: i for i, name in enumerate(names)}
+    name = method.__name__
+
     @functools.wraps(method)
     def with_logging(self, *args, **kwargs):
+        start = getattr(self, "time", 0)
         result = method(self, *args, **kwargs)
-        all_state = self.__dict__
-        state = dict()
-        for key in all_state.keys():
-            if not key.startswith("_"):
-                state[key] = all_state[key]
-        sig = inspect.signature(method)
-        bound = sig.bind(self, *args, **kwargs)
-        bound.apply_defaults()
-        arg_dict = {k: v for k, v in bound.arguments.items() if k != "self"}
-        entry = {
-            "method": method.__name__,
-            "params": arg_dict,
-        } | state
-        self._log.append(entry)
+        values = list(defaults)
+        values[:len(args)] = args
+        for key, value in kwargs.items():
+            values[positions[key]] = value
+        self._log.append(name, names, values, self.time - start, self)
         return result
 
     return with_logging
@@ -55,18 +232,28 @@ class Base:
 
     This class keeps track of its heading and position but does not perform any actual movements.
     It logs all actions extensively for debugging purposes.
+
+    Moves advance a simulated clock, `time`, by how long the real robot would
+    take to follow the trapezoidal speed profiles set by the `MotionConfig`.
+    Each log entry records the duration of its call. Time spent settling at
+    the end of a move is not modeled.
     """
 
     @log
     def __init__(
         self,
         verbose: bool = False,
+        config: artemis_config.ArtemisConfig | None = None,
     ):
+        if config is None:
+            config = artemis_config.ArtemisConfig.default()
         self.x = 0
         self.y = 0
         self.heading = 0  # In degrees
+        self.time = 0  # Simulated time in milliseconds
+        self._motion = config.motion_config
         self._verbose = verbose
-        self._log = []
+        self._log = ActionLog()
         if self._verbose:
             print("Initialized Base with position (0, 0) and heading 0 degrees.")
 
@@ -81,19 +268,76 @@ class Base:
         if self._verbose:
             print(f"Position reset to ({x}, {y}).")
 
+    @log
+    def straight(
+        self,
+        distance: float,
+        then=None,
+        wait: bool = True,
+        speed: float | None = None,
+        acceleration: float | None = None,
+        timeout: float | None = None,
+        contact: bool = False,
+    ) -> float:
+        """Drives straight for a given distance.
+
+        Nothing is in the way here, so moves with `contact` go all the way.
+        """
+        duration = kinematics.straight_duration(
+            distance, self._motion, speed, acceleration,
+        )
+        if timeout is not None and timeout < duration:
+            if speed is None:
+                speed = self._motion.straight_speed
+            if acceleration is None:
+                acceleration = self._motion.straight_acceleration
+            distance = kinematics.profile_position(
+                timeout,
+                distance,
+                speed,
+                *kinematics.accelerations(acceleration),
+            )
+            duration = timeout
+        self.x, self.y = geometry.compute_new_position(
+            self.x, self.y, self.heading, distance,
+        )
+        self.time += duration
+
+        if self._verbose:
+            print(f"Drove {distance} mm in {duration:.0f} ms.")
+        return distance
+
     @log
     def turn_to(
         self,
         heading: float,
         then=None,
         wait: bool = True,
+        speed: float | None = None,
+        acceleration=None,
+        timeout: float | None = None,
+        contact: bool = False,
     ):
         """Turns the robot to face in the direction `heading`."""
         current_heading = self.heading
-        turn = (heading - current_heading) % 360
-        if turn > 180:
-            turn = turn - 360
+        turn = geometry.compute_turn(current_heading, heading)
+        duration = kinematics.turn_duration(
+            turn, self._motion, speed, acceleration,
+        )
+        if timeout is not None and timeout < duration:
+            if speed is None:
+                speed = self._motion.turn_rate
+            if acceleration is None:
+                acceleration = self._motion.turn_acceleration
+            turn = kinematics.profile_position(
+                timeout,
+                turn,
+                speed,
+                *kinematics.accelerations(acceleration),
+            )
+            duration = timeout
         self.heading = (self.heading + turn) % 360
+        self.time += duration
 
         if self._verbose:
             print(
@@ -110,42 +354,46 @@ class Base:
         y: float,
         then=None,
         wait: bool = True,
+        gear: str = planner.Gear.FWD,
+        timeout: float | None = None,
+        contact: bool = False,
     ):
         """Drives from the current location to (x, y)."""
         heading, distance = geometry.compute_trajectory(self.x, self.y, x, y)
+        if gear == planner.Gear.REV:
+            heading += 180
+            distance = -distance
         if self._verbose:
             print(f"Driving from ({self.x}, {self.y}) to ({x}, {y}).")
             print(f"Computed heading: {heading} Distance: {distance}.")
-        self.turn_to(heading)
+        self.turn_to(heading, timeout=timeout)
+        self.straight(distance, timeout=timeout)
+        # Like ArtemisBase, assume we've arrived at the destination.
         self.x = x
         self.y = y
         if self._verbose:
             print(f"Arrived at ({x}, {y}).")
 
+    def wait(self, time: float):
+        """Advances the simulated clock, like `pybricks.tools.wait`."""
+        self.time += time
+
     @property
     def log(self):
         return self._log
 
-    def _format_log_rows(self):
-        if not self._log:
-            return [], []
-        headers = list(self._log[0].keys())
-        rows = []
-        for entry in self._log:
-            row = []
-            for key in headers:
-                value = entry[key]
-                if key == "params":
-                    value = ", ".join(f"{k}={v}" for k, v in value.items())
-                row.append(str(value))
-            rows.append(row)
+    def _format_log_rows(self, start: int = 0, stop: int | None = None):
+        headers = self._log.headers()
+        if stop is None:
+            stop = len(self._log)
+        rows = [self._log.row(i) for i in range(start, min(stop, len(self._log)))]
         return headers, rows
 
-    def _rich_table(self):
+    def _rich_table(self, start: int, stop: int | None):
         if not _RICH_INSTALLED:
             print("Rich library not installed.")
             return
-        headers, rows = self._format_log_rows()
+        headers, rows = self._format_log_rows(start, stop)
         if not headers:
             print("No log entries.")
             return
@@ -156,8 +404,8 @@ class Base:
             table.add_row(*row)
         rich.print(table)
 
-    def _ascii_table(self):
-        headers, rows = self._format_log_rows()
+    def _ascii_table(self, start: int, stop: int | None):
+        headers, rows = self._format_log_rows(start, stop)
         if not headers:
             print("No log entries.")
             return
@@ -171,11 +419,33 @@ class Base:
             lines.append(format_str.format(*row))
         print("\n".join(lines))
 
-    def table(self):
+    def durations(self) -> list[tuple[str, float]]:
+        """The (method, duration) of each logged call, in milliseconds."""
+        methods = self._log.methods
+        return [
+            (methods[method_id], duration)
+            for method_id, duration in zip(
+                self._log.method, self._log.duration, strict=True,
+            )
+        ]
+
+    def table(self, page: int | None = None, page_size: int = 50):
+        """Prints the log as a table.
+
+        Args:
+            page: If set, only print this page of `page_size` entries,
+                counting from 0. Otherwise print the whole log.
+            page_size: The number of entries per page.
+        """
+        if page is None:
+            start, stop = 0, None
+        else:
+            start = page * page_size
+            stop = start + page_size
         if _RICH_INSTALLED:
-            self._rich_table()
+            self._rich_table(start, stop)
         else:
-            self._ascii_table()
+            self._ascii_table(start, stop)
 
 
 def demo():
@@ -185,6 +455,7 @@ def demo():
     base.drive_to(100, 100)
     base.turn_to(180)
     base.table()
+    print(f"Total time: {base.time:.0f} ms")
 
 
 if __name__ == "__main__":
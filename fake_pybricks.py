@@ -0,0 +1,901 @@
+"""A host-side stand-in for the pybricks modules, running on a virtual clock.
+
+With these modules installed, the mission scripts run unmodified on a
+laptop. Motors and drive bases follow the same trapezoidal speed profiles
+as `kinematics`, and time only passes on a virtual clock, so a whole match
+runs in well under a second:
+
+```
+python fake_pybricks.py sand_ship_bucket_flip.py
+```
+
+or from Python:
+
+```
+elapsed = fake_pybricks.run_file("sand_ship_bucket_flip.py")
+```
+
+Like on the hub, motor and drive base methods block when called normally
+and return awaitables when called inside `run_task`, and `multitask` runs
+its tasks side by side, cancelling the losers when `race=True`.
+
+Not modeled: motors settling at their target, wheel slip, and anything
+the robot bumps into. Moves that end with `Stop.NONE` skip deceleration
+but the robot is treated as stopped afterwards.
+"""
+
+import binascii
+import contextlib
+import math
+import pathlib
+import runpy
+import struct
+import sys
+import types
+from unittest import mock
+
+import kinematics
+
+# Default motor acceleration in deg/s², used for single motor moves.
+_MOTOR_ACCELERATION = 2000
+
+# Time that passes when tasks yield without waiting for anything, in ms.
+_TICK_MS = 1
+
+# How far attachment motors can move either way from where they start
+# before they stall, in degrees.
+_MOTOR_RANGE = 180
+
+
+class Clock:
+    """The virtual time, in milliseconds."""
+
+    def __init__(self):
+        self.now = 0.0
+
+
+clock = Clock()
+
+# Whether `run_task` is running, so methods should return awaitables.
+_running = False
+
+
+class _Until:
+    """An awaitable that finishes at a virtual time."""
+
+    def __init__(self, end: float, result=None, on_cancel=None):
+        self.end = end
+        self.result = result
+        self.on_cancel = on_cancel
+
+    def __await__(self):
+        try:
+            while clock.now < self.end:
+                yield self.end
+        except GeneratorExit:
+            if self.on_cancel is not None:
+                self.on_cancel()
+            raise
+        return self.result
+
+
+def _finish(end: float, result=None, on_cancel=None, wait: bool = True):
+    """Waits until `end`, blocking or returning an awaitable like pybricks."""
+    if not wait:
+        end = clock.now
+    if _running:
+        return _Until(end, result, on_cancel)
+    clock.now = max(clock.now, end)
+    return result
+
+
+class _Motion:
+    """A one dimensional move along a trapezoidal profile or at a velocity."""
+
+    def __init__(
+        self,
+        start: float = 0,
+        delta: float = 0,
+        speed: float = 0,
+        acceleration: float = 1,
+        deceleration: float | None = None,
+        velocity: float | None = None,
+    ):
+        self.start = start
+        self.delta = delta
+        self.speed = speed
+        self.acceleration = acceleration
+        self.deceleration = deceleration
+        self.velocity = velocity
+        self.start_time = clock.now
+        if velocity is not None:
+            self.end_time = math.inf
+        else:
+            self.end_time = self.start_time + kinematics.profile_duration(
+                delta, speed, acceleration, deceleration,
+            )
+
+    def at(self, time: float) -> float:
+        elapsed = time - self.start_time
+        if self.velocity is not None:
+            return self.start + self.velocity * elapsed / 1000
+        return self.start + kinematics.profile_position(
+            elapsed,
+            self.delta,
+            self.speed,
+            self.acceleration,
+            self.deceleration,
+        )
+
+    def rate(self, time: float) -> float:
+        """The speed at `time`, per second."""
+        if self.velocity is not None:
+            return self.velocity
+        if time >= self.end_time:
+            return 0
+        return (self.at(time + 1) - self.at(time)) * 1000
+
+
+def _deceleration(then, deceleration: float) -> float:
+    # Moves ending with Stop.NONE don't slow down at the end.
+    return math.inf if then == Stop.NONE else deceleration
+
+
+# -- pybricks.parameters --------------------------------------------------
+
+
+class _Constants:
+    """Namespace of named constants that print like the pybricks ones."""
+
+    def __init__(self, kind: str, names):
+        for name in names:
+            setattr(self, name, f"{kind}.{name}")
+
+
+Stop = _Constants("Stop", ("COAST", "COAST_SMART", "BRAKE", "HOLD", "NONE"))
+Axis = _Constants("Axis", ("X", "Y", "Z"))
+Port = _Constants("Port", ("A", "B", "C", "D", "E", "F"))
+Side = _Constants("Side", ("TOP", "BOTTOM", "FRONT", "BACK", "LEFT", "RIGHT"))
+Button = _Constants(
+    "Button", ("LEFT", "RIGHT", "CENTER", "BLUETOOTH", "UP", "DOWN"),
+)
+Color = _Constants(
+    "Color",
+    (
+        "NONE",
+        "BLACK",
+        "GRAY",
+        "WHITE",
+        "RED",
+        "ORANGE",
+        "BROWN",
+        "YELLOW",
+        "GREEN",
+        "CYAN",
+        "BLUE",
+        "VIOLET",
+        "MAGENTA",
+    ),
+)
+
+
+class Direction:
+    CLOCKWISE = 1
+    COUNTERCLOCKWISE = -1
+
+
+# -- pybricks.tools --------------------------------------------------------
+
+
+def wait(time: float):
+    """Pauses for `time` milliseconds of virtual time."""
+    return _finish(clock.now + max(time, 0))
+
+
+class StopWatch:
+    def __init__(self):
+        self._start = clock.now
+        self._paused_at = None
+
+    def time(self) -> int:
+        now = clock.now if self._paused_at is None else self._paused_at
+        return int(now - self._start)
+
+    def pause(self):
+        if self._paused_at is None:
+            self._paused_at = clock.now
+
+    def resume(self):
+        if self._paused_at is not None:
+            self._start += clock.now - self._paused_at
+            self._paused_at = None
+
+    def reset(self):
+        self._start = clock.now
+        if self._paused_at is not None:
+            self._paused_at = clock.now
+
+
+class _MultiTask:
+    def __init__(self, tasks, race: bool):
+        self.tasks = tasks
+        self.race = race
+
+    def __await__(self):
+        iterators = [task.__await__() for task in self.tasks]
+        count = len(iterators)
+        wakes = [clock.now] * count
+        done = [False] * count
+        results = [None] * count
+        try:
+            while True:
+                for i, iterator in enumerate(iterators):
+                    if done[i] or wakes[i] > clock.now:
+                        continue
+                    try:
+                        wakes[i] = iterator.send(None)
+                    except StopIteration as stop:
+                        done[i] = True
+                        results[i] = stop.value
+                        if self.race:
+                            return results
+                if all(done):
+                    return results
+                yield min(wakes[i] for i in range(count) if not done[i])
+        finally:
+            for i, iterator in enumerate(iterators):
+                if not done[i]:
+                    iterator.close()
+
+
+def multitask(*tasks, race: bool = False):
+    """Runs tasks side by side. With `race=True`, stops when one finishes."""
+    return _MultiTask(tasks, race)
+
+
+def run_task(task=None):
+    """Runs a coroutine to completion on the virtual clock.
+
+    Without arguments, returns whether a task is running, like on the hub.
+    """
+    global _running
+    if task is None:
+        return _running
+    if _running:
+        raise RuntimeError("run_task is already running.")
+    _running = True
+    iterator = task.__await__()
+    try:
+        while True:
+            try:
+                wake = iterator.send(None)
+            except StopIteration as stop:
+                return stop.value
+            if wake is None or wake <= clock.now:
+                clock.now += _TICK_MS
+            else:
+                clock.now = wake
+    finally:
+        _running = False
+
+
+# -- pybricks.pupdevices ---------------------------------------------------
+
+
+class _Control:
+    """Stores controller settings without doing anything with them."""
+
+    def __init__(self):
+        self._pid = (0, 0, 0, 0, 0)
+        self._tolerances = (0, 0)
+        self._limits = (0, 0, 0)
+        self._stall_tolerances = (0, 0)
+
+    def pid(self, kp=None, ki=None, kd=None, integral_deadzone=None,
+            integral_rate=None):
+        values = (kp, ki, kd, integral_deadzone, integral_rate)
+        if all(value is None for value in values):
+            return self._pid
+        self._pid = tuple(
+            old if new is None else new
+            for old, new in zip(self._pid, values, strict=True)
+        )
+
+    def target_tolerances(self, speed=None, position=None):
+        if speed is None and position is None:
+            return self._tolerances
+        self._tolerances = (
+            self._tolerances[0] if speed is None else speed,
+            self._tolerances[1] if position is None else position,
+        )
+
+    def limits(self, speed=None, acceleration=None, torque=None):
+        values = (speed, acceleration, torque)
+        if all(value is None for value in values):
+            return self._limits
+        self._limits = tuple(
+            old if new is None else new
+            for old, new in zip(self._limits, values, strict=True)
+        )
+
+    def stall_tolerances(self, speed=None, time=None):
+        if speed is None and time is None:
+            return self._stall_tolerances
+        self._stall_tolerances = (
+            self._stall_tolerances[0] if speed is None else speed,
+            self._stall_tolerances[1] if time is None else time,
+        )
+
+
+class Motor:
+    def __init__(
+        self,
+        port,
+        positive_direction=Direction.CLOCKWISE,
+        gears=None,
+        reset_angle: bool = True,
+        profile=None,
+    ):
+        self.port = port
+        self.positive_direction = positive_direction
+        self.control = _Control()
+        # Report the acceleration that moves are simulated with.
+        self.control.limits(acceleration=_MOTOR_ACCELERATION)
+        # Mechanical stops, relative to where the motor starts.
+        self.limits = (-_MOTOR_RANGE, _MOTOR_RANGE)
+        self._motion = _Motion(0)
+        self._offset = 0
+        # Set by DriveBase to (drive base, side) for drive motors.
+        self._drive = None
+
+    def _position(self) -> float:
+        if self._drive is not None:
+            drive_base, side = self._drive
+            return drive_base._wheel_angle(side)
+        return self._motion.at(clock.now)
+
+    def angle(self) -> int:
+        # Whole degrees, like the hub.
+        return int(round(self._position() + self._offset))
+
+    def speed(self, window=None) -> float:
+        if self._drive is not None:
+            drive_base, side = self._drive
+            return drive_base._wheel_speed(side)
+        return self._motion.rate(clock.now)
+
+    def load(self) -> float:
+        return 0
+
+    def stalled(self) -> bool:
+        return False
+
+    def done(self) -> bool:
+        return clock.now >= self._motion.end_time
+
+    def reset_angle(self, angle: float | None = None):
+        if angle is None:
+            # Back to the absolute encoder reading.
+            angle = (self._position() + 180) % 360 - 180
+        self._offset = angle - self._position()
+
+    def _stop_here(self):
+        if self._drive is not None:
+            # Taking over a drive motor stops the drive base, like on the hub.
+            self._drive[0]._begin()
+            return
+        self._motion = _Motion(self._motion.at(clock.now))
+
+    def stop(self):
+        self._stop_here()
+
+    def brake(self):
+        self._stop_here()
+
+    def hold(self):
+        self._stop_here()
+
+    def run(self, speed: float):
+        self._motion = _Motion(
+            self._motion.at(clock.now), velocity=speed,
+        )
+
+    def dc(self, duty: float):
+        self.run(duty * 10)
+
+    def _move(self, delta: float, speed: float, then, wait: bool):
+        self._motion = _Motion(
+            self._motion.at(clock.now),
+            delta=delta,
+            speed=abs(speed),
+            acceleration=_MOTOR_ACCELERATION,
+            deceleration=_deceleration(then, _MOTOR_ACCELERATION),
+        )
+        return _finish(
+            self._motion.end_time, on_cancel=self._stop_here, wait=wait,
+        )
+
+    def run_target(self, speed, target_angle, then=Stop.HOLD, wait=True):
+        return self._move(target_angle - self.angle(), speed, then, wait)
+
+    def run_angle(self, speed, rotation_angle, then=Stop.HOLD, wait=True):
+        if speed < 0:
+            rotation_angle = -rotation_angle
+        return self._move(rotation_angle, speed, then, wait)
+
+    def run_time(self, speed, time, then=Stop.HOLD, wait=True):
+        self.run(speed)
+        end = clock.now + time
+        if not _running and not wait:
+            return None
+        result = _finish(end, on_cancel=self._stop_here, wait=wait)
+        if not _running:
+            self._stop_here()
+        return result
+
+    def run_until_stalled(self, speed, then=Stop.COAST, duty_limit=None):
+        position = self._motion.at(clock.now)
+        stop = self.limits[1] if speed > 0 else self.limits[0]
+        self._motion = _Motion(
+            position,
+            delta=stop - position,
+            speed=abs(speed),
+            acceleration=_MOTOR_ACCELERATION,
+            deceleration=math.inf,
+        )
+        # The angle where it stalls, in the motor's own reference.
+        stall_angle = stop + self._offset
+        return _finish(
+            self._motion.end_time, stall_angle, on_cancel=self._stop_here,
+        )
+
+    def track_target(self, target_angle):
+        self._motion = _Motion(target_angle - self._offset)
+
+
+class ColorSensor:
+    def __init__(self, port):
+        self.port = port
+        self.lights = _Lights()
+
+    def color(self, surface: bool = True):
+        return Color.WHITE
+
+    def reflection(self) -> int:
+        return 100
+
+    def ambient(self) -> int:
+        return 50
+
+    def hsv(self, surface: bool = True):
+        return _HSV(0, 0, 100)
+
+    def detectable_colors(self, colors=None):
+        return None
+
+
+class _HSV:
+    def __init__(self, h, s, v):
+        self.h = h
+        self.s = s
+        self.v = v
+
+
+class _Lights:
+    def on(self, brightness=100):
+        pass
+
+    def off(self):
+        pass
+
+
+# -- pybricks.robotics -----------------------------------------------------
+
+
+class DriveBase:
+    def __init__(
+        self,
+        left_motor: Motor,
+        right_motor: Motor,
+        wheel_diameter: float,
+        axle_track: float,
+    ):
+        self.left_motor = left_motor
+        self.right_motor = right_motor
+        self.wheel_diameter = wheel_diameter
+        self.axle_track = axle_track
+        self.heading_control = _Control()
+        self.distance_control = _Control()
+        self._settings = [307, 1152, 251, 1032]
+        self._gyro = False
+        # The state at the start of the current move.
+        self._distance = 0.0
+        self._angle = 0.0
+        self._x = 0.0
+        self._y = 0.0
+        self._heading_offset = 0.0
+        # The current move: progress along it, and the distance (mm) and
+        # angle (deg) covered per unit of progress.
+        self._progress = _Motion(0)
+        self._per_distance = 0.0
+        self._per_angle = 0.0
+        self._wheel_offsets = {}
+        for side, motor in ((1, left_motor), (-1, right_motor)):
+            self._wheel_offsets[side] = motor._position()
+            motor._drive = (self, side)
+        _drive_bases.append(self)
+
+    # State -----------------------------------------------------------------
+
+    def _progress_now(self) -> float:
+        return self._progress.at(clock.now)
+
+    def _distance_now(self) -> float:
+        return self._distance + self._per_distance * self._progress_now()
+
+    def _angle_now(self) -> float:
+        return self._angle + self._per_angle * self._progress_now()
+
+    def distance(self) -> int:
+        # Whole millimeters and degrees, like the hub.
+        return int(round(self._distance_now()))
+
+    def angle(self) -> int:
+        return int(round(self._angle_now()))
+
+    def _rates(self) -> tuple[float, float]:
+        """The (drive speed, turn rate) now."""
+        rate = self._progress.rate(clock.now)
+        return self._per_distance * rate, self._per_angle * rate
+
+    def state(self):
+        speed, turn_rate = self._rates()
+        return (
+            self.distance(),
+            int(round(speed)),
+            self.angle(),
+            int(round(turn_rate)),
+        )
+
+    def field_pose(self) -> tuple[float, float, float]:
+        """The true (x, y, heading) on the field. Not part of pybricks."""
+        progress = self._progress_now()
+        distance = self._per_distance * progress
+        turn = self._per_angle * progress
+        heading = self._angle + self._heading_offset
+        if distance == 0:
+            x, y = self._x, self._y
+        elif turn == 0:
+            x = self._x + distance * math.sin(math.radians(heading))
+            y = self._y + distance * math.cos(math.radians(heading))
+        else:
+            curvature = math.radians(turn) / distance
+            h0 = math.radians(heading)
+            h1 = math.radians(heading + turn)
+            x = self._x + (math.cos(h0) - math.cos(h1)) / curvature
+            y = self._y + (math.sin(h1) - math.sin(h0)) / curvature
+        return x, y, heading + turn
+
+    def place(self, x: float, y: float, heading: float | None = None):
+        """Puts the robot at (x, y) on the field. Not part of pybricks."""
+        self._begin()
+        self._x = x
+        self._y = y
+        if heading is not None:
+            self._heading_offset = heading - self._angle
+
+    def _wheel_angle(self, side: int) -> float:
+        """The angle of a drive motor, from the distance and heading."""
+        turn = math.radians(self._angle_now()) * self.axle_track / 2
+        wheel = self._distance_now() + side * turn
+        return self._wheel_offsets[side] + wheel * 360 / (
+            math.pi * self.wheel_diameter
+        )
+
+    def _wheel_speed(self, side: int) -> float:
+        speed, turn_rate = self._rates()
+        wheel = speed + side * math.radians(turn_rate) * self.axle_track / 2
+        return wheel * 360 / (math.pi * self.wheel_diameter)
+
+    def _begin(self):
+        """Freezes the current state as the start of a new move."""
+        x, y, _ = self.field_pose()
+        self._distance = self._distance_now()
+        self._angle = self._angle_now()
+        self._x = x
+        self._y = y
+        self._progress = _Motion(0)
+        self._per_distance = 0.0
+        self._per_angle = 0.0
+
+    def _move(self, per_distance, per_angle, progress, wait):
+        self._per_distance = per_distance
+        self._per_angle = per_angle
+        self._progress = progress
+        return _finish(progress.end_time, on_cancel=self.stop, wait=wait)
+
+    # Settings --------------------------------------------------------------
+
+    def settings(
+        self,
+        straight_speed=None,
+        straight_acceleration=None,
+        turn_rate=None,
+        turn_acceleration=None,
+    ):
+        values = (
+            straight_speed,
+            straight_acceleration,
+            turn_rate,
+            turn_acceleration,
+        )
+        if all(value is None for value in values):
+            return tuple(self._settings)
+        for i, value in enumerate(values):
+            if value is not None:
+                self._settings[i] = value
+
+    def use_gyro(self, use_gyro: bool):
+        self._gyro = use_gyro
+
+    def reset(self, distance: float = 0, angle: float | None = None):
+        self._begin()
+        self._distance = distance
+        if angle is not None:
+            # The robot doesn't move, only what it thinks its heading is.
+            self._heading_offset += self._angle - angle
+            self._angle = angle
+
+    # Moves -----------------------------------------------------------------
+
+    def done(self) -> bool:
+        return clock.now >= self._progress.end_time
+
+    def stalled(self) -> bool:
+        return False
+
+    def stop(self):
+        self._begin()
+
+    def brake(self):
+        self._begin()
+
+    def straight(self, distance, then=Stop.HOLD, wait=True):
+        self._begin()
+        speed, acceleration, _, _ = self._settings
+        accelerate, decelerate = kinematics.accelerations(acceleration)
+        progress = _Motion(
+            0,
+            abs(distance),
+            speed,
+            accelerate,
+            _deceleration(then, decelerate),
+        )
+        return self._move(1 if distance >= 0 else -1, 0, progress, wait)
+
+    def turn(self, angle, then=Stop.HOLD, wait=True):
+        self._begin()
+        _, _, turn_rate, acceleration = self._settings
+        accelerate, decelerate = kinematics.accelerations(acceleration)
+        progress = _Motion(
+            0,
+            abs(angle),
+            turn_rate,
+            accelerate,
+            _deceleration(then, decelerate),
+        )
+        return self._move(0, 1 if angle >= 0 else -1, progress, wait)
+
+    def curve(self, radius, angle, then=Stop.HOLD, wait=True):
+        """Drives along a circle.
+
+        The sign of `radius` picks the side of the circle's center (positive
+        is right) and a positive `angle` drives forward.
+        """
+        self._begin()
+        length = abs(radius) * math.radians(abs(angle))
+        if length == 0:
+            return _finish(clock.now, wait=wait)
+        speed, acceleration, _, _ = self._settings
+        accelerate, decelerate = kinematics.accelerations(acceleration)
+        progress = _Motion(
+            0,
+            length,
+            speed,
+            accelerate,
+            _deceleration(then, decelerate),
+        )
+        forward = 1 if angle >= 0 else -1
+        side = 1 if radius >= 0 else -1
+        return self._move(
+            forward, side * forward * abs(angle) / length, progress, wait,
+        )
+
+    def arc(self, radius, angle=None, distance=None, then=Stop.HOLD,
+            wait=True):
+        if angle is None:
+            angle = math.degrees(distance / abs(radius))
+        return self.curve(radius, angle, then=then, wait=wait)
+
+    def drive(self, speed, turn_rate):
+        self._begin()
+        self._per_distance = speed
+        self._per_angle = turn_rate
+        # Progress is the time driven, in seconds.
+        self._progress = _Motion(0, velocity=1)
+
+
+_drive_bases = []
+
+
+# -- pybricks.hubs ---------------------------------------------------------
+
+
+class _IMU:
+    def __init__(self):
+        self._heading_offset = 0
+
+    def heading(self) -> float:
+        angle = _drive_bases[-1]._angle_now() if _drive_bases else 0
+        return angle + self._heading_offset
+
+    def reset_heading(self, angle: float):
+        self._heading_offset += angle - self.heading()
+
+    def ready(self) -> bool:
+        return True
+
+    def stationary(self) -> bool:
+        return True
+
+    def tilt(self):
+        return (0, 0)
+
+    def acceleration(self, axis=None):
+        return 0 if axis is not None else (0, 0, 9810)
+
+    def angular_velocity(self, axis=None):
+        return 0 if axis is not None else (0, 0, 0)
+
+
+class _Silent:
+    """Accepts any call, for the hub's lights, display and speaker."""
+
+    def __getattr__(self, name):
+        def ignore(*args, **kwargs):
+            return None
+
+        return ignore
+
+
+class _Buttons:
+    def pressed(self):
+        return set()
+
+
+class _Battery:
+    def voltage(self) -> int:
+        return 8000
+
+    def current(self) -> int:
+        return 100
+
+
+# Hub storage persists between runs in the same Python process.
+_storage = bytearray(512)
+
+
+class _System:
+    name = "Fake Hub"
+
+    def storage(self, offset: int, read: int | None = None, write=None):
+        if write is not None:
+            _storage[offset : offset + len(write)] = write
+            return None
+        return bytes(_storage[offset : offset + read])
+
+    def set_stop_button(self, button):
+        pass
+
+    def shutdown(self):
+        pass
+
+
+class PrimeHub:
+    def __init__(self, top_side=Axis.Z, front_side=Axis.X, broadcast_channel=None,
+                 observe_channels=None):
+        self.imu = _IMU()
+        self.light = _Silent()
+        self.display = _Silent()
+        self.speaker = _Silent()
+        self.buttons = _Buttons()
+        self.battery = _Battery()
+        self.system = _System()
+        self.charger = _Silent()
+
+
+# -- Installing the modules ------------------------------------------------
+
+
+def _module(name: str, **attributes) -> types.ModuleType:
+    module = types.ModuleType(name)
+    module.__dict__.update(attributes)
+    return module
+
+
+def modules() -> dict:
+    """The fake modules, by name, ready to go into `sys.modules`."""
+    pybricks = _module("pybricks")
+    submodules = {
+        "pybricks.parameters": _module(
+            "pybricks.parameters",
+            Axis=Axis,
+            Button=Button,
+            Color=Color,
+            Direction=Direction,
+            Port=Port,
+            Side=Side,
+            Stop=Stop,
+        ),
+        "pybricks.tools": _module(
+            "pybricks.tools",
+            StopWatch=StopWatch,
+            multitask=multitask,
+            run_task=run_task,
+            wait=wait,
+        ),
+        "pybricks.pupdevices": _module(
+            "pybricks.pupdevices",
+            ColorSensor=ColorSensor,
+            Motor=Motor,
+        ),
+        "pybricks.robotics": _module("pybricks.robotics", DriveBase=DriveBase),
+        "pybricks.hubs": _module("pybricks.hubs", PrimeHub=PrimeHub),
+    }
+    for name, module in submodules.items():
+        setattr(pybricks, name.split(".")[1], module)
+    return {
+        "pybricks": pybricks,
+        **submodules,
+        "umath": math,
+        "ustruct": struct,
+        "ubinascii": binascii,
+    }
+
+
+def reset():
+    """Restarts the virtual clock and forgets the drive bases."""
+    global _running
+    clock.now = 0.0
+    _running = False
+    _drive_bases.clear()
+
+
+@contextlib.contextmanager
+def installed():
+    """Installs the fake modules while in the `with` block.
+
+    Modules imported inside the block, like `artemis_base_v2`, are removed
+    again afterwards so they are imported fresh next time.
+    """
+    with mock.patch.dict(sys.modules, modules()):
+        yield
+
+
+def run_file(path: str) -> float:
+    """Runs a program as `__main__` and returns the virtual time it took."""
+    reset()
+    directory = str(pathlib.Path(path).resolve().parent)
+    with installed(), mock.patch.object(sys, "path", [directory] + sys.path):
+        runpy.run_path(path, run_name="__main__")
+    return clock.now
+
+
+def main():
+    for path in sys.argv[1:]:
+        elapsed = run_file(path)
+        print(f"{path}: {elapsed / 1000:.1f} s of simulated time")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,6 @@
 """Geometry utilities for robotics."""
 
-from umath import atan2, cos, degrees, radians, sin, sqrt
+from umath import acos, atan2, cos, degrees, pi, radians, sin, sqrt
 
 
 def compute_trajectory(
@@ -36,4 +36,387 @@ def compute_new_position(
     """Given a current position, heading, and distance, compute the new position."""
     new_x = x0 + distance * sin(radians(heading))
     new_y = y0 + distance * cos(radians(heading))
-    return new_x, new_y
\ No newline at end of file
+    return new_x, new_y
+
+
+def compute_turn(
+    heading0: float,
+    heading1: float,
+) -> float:
+    """Compute the shortest turn from `heading0` to `heading1`.
+
+    Returns: the signed turn in degrees, in the range (-180, 180].
+    """
+    turn = (heading1 - heading0) % 360
+    if turn > 180:
+        turn = turn - 360
+    return turn
+
+
+def normalize_heading(heading):
+    """Wrap `heading` into the range (-180, 180].
+
+    Works on single values and on NumPy arrays.
+    """
+    heading = heading % 360
+    return heading - 360 * (heading > 180)
+
+
+def compose_pose(
+    x0: float,
+    y0: float,
+    heading: float,
+    forward: float,
+    right: float,
+    turn: float,
+) -> tuple[float, float, float]:
+    """Apply a move given in the robot's frame to a pose.
+
+    Args:
+        x0: initial x position.
+        y0: initial y position.
+        heading: initial heading in degrees.
+        forward: distance moved along the heading.
+        right: distance moved to the right of the heading.
+        turn: change in heading in degrees, positive to the right.
+
+    Returns: the new (x, y, heading).
+    """
+    h = radians(heading)
+    new_x = x0 + forward * sin(h) + right * cos(h)
+    new_y = y0 + forward * cos(h) - right * sin(h)
+    return new_x, new_y, heading + turn
+
+
+class Pose:
+    """A mutable (x, y, heading), updated in place.
+
+    Moves update the pose in place rather than returning new tuples, so
+    code that runs on every move doesn't allocate. Headings are in degrees.
+    """
+
+    __slots__ = ("x", "y", "heading")
+
+    def __init__(
+        self,
+        x: float = 0,
+        y: float = 0,
+        heading: float = 0,
+    ):
+        self.x = x
+        self.y = y
+        self.heading = heading
+
+    def set(
+        self,
+        x: float,
+        y: float,
+        heading: float | None = None,
+    ):
+        """Sets the position, and the heading if given."""
+        self.x = x
+        self.y = y
+        if heading is not None:
+            self.heading = heading
+
+    def advance(
+        self,
+        distance: float,
+        heading: float | None = None,
+    ):
+        """Moves `distance` along `heading`, or the pose's own heading."""
+        if heading is None:
+            heading = self.heading
+        h = radians(heading)
+        self.x += distance * sin(h)
+        self.y += distance * cos(h)
+
+    def rotate(self, turn: float):
+        """Turns in place by `turn` degrees, positive to the right."""
+        self.heading += turn
+
+    def arc(
+        self,
+        radius: float,
+        turn: float,
+    ):
+        """Drives forward along an arc, like `compute_arc_end`."""
+        if turn == 0:
+            return
+        side = 1 if turn > 0 else -1
+        h0 = radians(self.heading)
+        h1 = radians(self.heading + turn)
+        self.x += side * radius * (cos(h0) - cos(h1))
+        self.y += side * radius * (sin(h1) - sin(h0))
+        self.heading += turn
+
+    def __repr__(self):
+        return f"Pose(x={self.x}, y={self.y}, heading={self.heading})"
+
+
+def compute_arc_end(
+    x0: float,
+    y0: float,
+    heading: float,
+    radius: float,
+    turn: float,
+) -> tuple[float, float, float]:
+    """Compute where the robot ends up after driving forward along an arc.
+
+    Args:
+        x0: initial x position.
+        y0: initial y position.
+        heading: initial heading in degrees.
+        radius: the radius of the arc, always positive.
+        turn: the change in heading in degrees. Positive values turn right
+          (clockwise), negative values turn left.
+
+    Returns: the new (x, y, heading).
+    """
+    if turn == 0:
+        return x0, y0, heading
+    side = 1 if turn > 0 else -1
+    h0 = radians(heading)
+    h1 = radians(heading + turn)
+    # The center of the circle is `radius` to the side the robot turns to.
+    center_x = x0 + side * radius * cos(h0)
+    center_y = y0 - side * radius * sin(h0)
+    new_x = center_x - side * radius * cos(h1)
+    new_y = center_y + side * radius * sin(h1)
+    return new_x, new_y, heading + turn
+
+
+def _mod2pi(angle: float) -> float:
+    return angle % (2 * pi)
+
+
+def _dubins_words(alpha: float, beta: float, d: float) -> list:
+    """The Dubins path candidates for a normalized start and goal.
+
+    Angles are counterclockwise radians and lengths are in units of the
+    turning radius. Returns a list of (word, (t, p, q)).
+    """
+    sa, sb = sin(alpha), sin(beta)
+    ca, cb = cos(alpha), cos(beta)
+    c_ab = cos(alpha - beta)
+    words = []
+
+    p_sq = 2 + d * d - 2 * c_ab + 2 * d * (sa - sb)
+    if p_sq >= 0:
+        tmp = atan2(cb - ca, d + sa - sb)
+        words.append(
+            ("LSL", (_mod2pi(-alpha + tmp), sqrt(p_sq), _mod2pi(beta - tmp)))
+        )
+
+    p_sq = 2 + d * d - 2 * c_ab + 2 * d * (sb - sa)
+    if p_sq >= 0:
+        tmp = atan2(ca - cb, d - sa + sb)
+        words.append(
+            ("RSR", (_mod2pi(alpha - tmp), sqrt(p_sq), _mod2pi(-beta + tmp)))
+        )
+
+    p_sq = -2 + d * d + 2 * c_ab + 2 * d * (sa + sb)
+    if p_sq >= 0:
+        p = sqrt(p_sq)
+        tmp = atan2(-ca - cb, d + sa + sb) - atan2(-2, p)
+        words.append(("LSR", (_mod2pi(-alpha + tmp), p, _mod2pi(-beta + tmp))))
+
+    p_sq = d * d - 2 + 2 * c_ab - 2 * d * (sa + sb)
+    if p_sq >= 0:
+        p = sqrt(p_sq)
+        tmp = atan2(ca + cb, d - sa - sb) - atan2(2, p)
+        words.append(("RSL", (_mod2pi(alpha - tmp), p, _mod2pi(beta - tmp))))
+
+    tmp = (6 - d * d + 2 * c_ab + 2 * d * (sa - sb)) / 8
+    if abs(tmp) <= 1:
+        p = _mod2pi(2 * pi - acos(tmp))
+        t = _mod2pi(alpha - atan2(ca - cb, d - sa + sb) + p / 2)
+        words.append(("RLR", (t, p, _mod2pi(alpha - beta - t + p))))
+
+    tmp = (6 - d * d + 2 * c_ab + 2 * d * (sb - sa)) / 8
+    if abs(tmp) <= 1:
+        p = _mod2pi(2 * pi - acos(tmp))
+        t = _mod2pi(-alpha - atan2(ca - cb, d + sa - sb) + p / 2)
+        words.append(("LRL", (t, p, _mod2pi(beta - alpha - t + p))))
+
+    return words
+
+
+def compute_dubins_path(
+    x0: float,
+    y0: float,
+    heading0: float,
+    x1: float,
+    y1: float,
+    heading1: float,
+    radius: float,
+) -> list:
+    """Compute the shortest forward path between two poses.
+
+    The path is made of at most three segments, each either an arc of
+    `radius` or a straight line (a Dubins path).
+
+    Args:
+        x0: initial x position.
+        y0: initial y position.
+        heading0: initial heading in degrees.
+        x1: target x position.
+        y1: target y position.
+        heading1: target heading in degrees.
+        radius: the turning radius of the arcs.
+
+    Returns: a list of (turn, length) segments. `turn` is the change in
+      heading in degrees (positive is right, 0 for a straight line) and
+      `length` is the distance driven along the segment.
+    """
+    # Dubins paths are usually written with counterclockwise angles from
+    # the x axis, so convert from headings first.
+    theta0 = radians(90 - heading0)
+    theta1 = radians(90 - heading1)
+    dx = x1 - x0
+    dy = y1 - y0
+    d = sqrt(dx * dx + dy * dy) / radius
+    phi = atan2(dy, dx)
+    alpha = _mod2pi(theta0 - phi)
+    beta = _mod2pi(theta1 - phi)
+
+    best = None
+    for word, lengths in _dubins_words(alpha, beta, d):
+        total = lengths[0] + lengths[1] + lengths[2]
+        if best is None or total < best[0]:
+            best = (total, word, lengths)
+
+    segments = []
+    # Index rather than zip: MicroPython's zip has no `strict`.
+    _, word, lengths = best
+    for i in range(3):
+        kind = word[i]
+        length = lengths[i]
+        if length <= 0:
+            continue
+        if kind == "S":
+            segments.append((0, length * radius))
+        else:
+            # A left turn decreases the heading.
+            side = -1 if kind == "L" else 1
+            segments.append((side * degrees(length), length * radius))
+    return segments
+
+
+def compute_arc_to_point(
+    x0: float,
+    y0: float,
+    heading: float,
+    x1: float,
+    y1: float,
+    radius: float,
+):
+    """Compute the shortest arc-then-line path to a point.
+
+    Args:
+        x0: initial x position.
+        y0: initial y position.
+        heading: initial heading in degrees.
+        x1: target x position.
+        y1: target y position.
+        radius: the turning radius of the arc.
+
+    Returns: a list of (turn, length) segments like `compute_dubins_path`,
+      or None if the target is too close to reach with this radius.
+    """
+    best = None
+    h0 = radians(heading)
+    for side in (1, -1):
+        center_x = x0 + side * radius * cos(h0)
+        center_y = y0 - side * radius * sin(h0)
+        bearing, to_target = compute_trajectory(center_x, center_y, x1, y1)
+        if to_target < radius:
+            continue
+        # Heading at the point where the line leaves the circle.
+        tangent = degrees(acos(radius / to_target))
+        final_heading = bearing - side * tangent + side * 90
+        turn = side * ((side * (final_heading - heading)) % 360)
+        line = sqrt(to_target**2 - radius**2)
+        total = radius * radians(abs(turn)) + line
+        if best is None or total < best[0]:
+            best = (total, turn, line)
+    if best is None:
+        return None
+    _, turn, line = best
+    return [(turn, radius * radians(abs(turn))), (0, line)]
+
+
+# The functions below are NumPy versions for host tools, which work on whole
+# routes at once. NumPy is imported inside them so that this module still
+# imports on the hub.
+
+
+def compute_trajectories(x, y):
+    """Compute the heading and distance of each leg of a route.
+
+    Args:
+        x: the x positions of the waypoints, in order.
+        y: the y positions of the waypoints, in order.
+
+    Returns: a pair of arrays (headings, distances), one entry shorter than
+      `x` and `y`, like `compute_trajectory` for each pair of waypoints.
+    """
+    import numpy as np
+
+    dx = np.diff(np.asarray(x, dtype=float))
+    dy = np.diff(np.asarray(y, dtype=float))
+    return np.degrees(np.arctan2(dx, dy)), np.hypot(dx, dy)
+
+
+def compute_new_positions(x0, y0, heading, distance):
+    """Like `compute_new_position`, for arrays of positions and moves.
+
+    The arguments are broadcast against each other.
+    """
+    import numpy as np
+
+    h = np.radians(heading)
+    return x0 + distance * np.sin(h), y0 + distance * np.cos(h)
+
+
+def compute_route_positions(x0: float, y0: float, headings, distances):
+    """Compute the positions reached by driving a route of legs.
+
+    Args:
+        x0: initial x position.
+        y0: initial y position.
+        headings: the heading of each leg in degrees.
+        distances: the distance driven along each leg.
+
+    Returns: a pair of arrays (x, y) of the start and the end of each leg,
+      one entry longer than `headings`.
+    """
+    import numpy as np
+
+    h = np.radians(np.asarray(headings, dtype=float))
+    distances = np.asarray(distances, dtype=float)
+    x = np.concatenate(([x0], x0 + np.cumsum(distances * np.sin(h))))
+    y = np.concatenate(([y0], y0 + np.cumsum(distances * np.cos(h))))
+    return x, y
+
+
+def compute_turns(heading0, heading1):
+    """Like `compute_turn`, for arrays of headings."""
+    return normalize_heading(heading1 - heading0)
+
+
+def compose_poses(x0, y0, heading, forward, right, turn):
+    """Like `compose_pose`, for arrays of poses and moves.
+
+    The arguments are broadcast against each other.
+    """
+    import numpy as np
+
+    h = np.radians(heading)
+    sin_h = np.sin(h)
+    cos_h = np.cos(h)
+    return (
+        x0 + forward * sin_h + right * cos_h,
+        y0 + forward * cos_h - right * sin_h,
+        heading + turn,
+    )
@@ -0,0 +1,131 @@
+"""Timing of the drive base's trapezoidal speed profiles.
+
+Pybricks moves the drive base by accelerating up to the configured speed,
+cruising, and decelerating to a stop. These functions estimate how long
+that takes, and where the robot is along the way, from a `MotionConfig`.
+Speeds are per second, accelerations per second squared and times are in
+milliseconds, like the hub's `StopWatch`.
+
+This module only uses plain Python, so it runs on the host and the hub.
+"""
+
+_INFINITY = float("inf")
+
+
+def accelerations(value) -> tuple[float, float]:
+    """Splits an acceleration setting into (acceleration, deceleration).
+
+    Pybricks accepts either a single value or a pair for these settings.
+    """
+    if isinstance(value, (tuple, list)):
+        return value[0], value[1]
+    return value, value
+
+
+def _ramps(
+    distance: float,
+    speed: float,
+    acceleration: float,
+    deceleration: float,
+) -> tuple[float, float, float]:
+    """Returns (peak speed, time accelerating, time cruising) in seconds."""
+    ramp = speed**2 / (2 * acceleration) + speed**2 / (2 * deceleration)
+    if distance >= ramp:
+        return speed, speed / acceleration, (distance - ramp) / speed
+    # Never reaches full speed: a triangular profile.
+    if deceleration == _INFINITY:
+        # Moves that don't stop at the end speed up the whole way.
+        peak = (2 * distance * acceleration) ** 0.5
+    else:
+        peak = (
+            2 * distance * acceleration * deceleration
+            / (acceleration + deceleration)
+        ) ** 0.5
+    return peak, peak / acceleration, 0
+
+
+def profile_duration(
+    distance: float,
+    speed: float,
+    acceleration: float,
+    deceleration: float | None = None,
+) -> float:
+    """How long a move of `distance` takes, in milliseconds.
+
+    Args:
+        distance: The distance or angle to move. The sign doesn't matter.
+        speed: The maximum speed.
+        acceleration: The acceleration.
+        deceleration: The deceleration, if different from `acceleration`.
+    """
+    if deceleration is None:
+        deceleration = acceleration
+    distance = abs(distance)
+    if distance == 0:
+        return 0
+    peak, accelerating, cruising = _ramps(
+        distance, abs(speed), acceleration, deceleration,
+    )
+    return 1000 * (accelerating + cruising + peak / deceleration)
+
+
+def profile_position(
+    time: float,
+    distance: float,
+    speed: float,
+    acceleration: float,
+    deceleration: float | None = None,
+) -> float:
+    """How far a move of `distance` has gotten after `time` milliseconds.
+
+    Returns: the distance covered, with the same sign as `distance`.
+    """
+    if deceleration is None:
+        deceleration = acceleration
+    sign = 1 if distance >= 0 else -1
+    distance = abs(distance)
+    if distance == 0 or time <= 0:
+        return 0
+    t = time / 1000
+    peak, accelerating, cruising = _ramps(
+        distance, abs(speed), acceleration, deceleration,
+    )
+    if t <= accelerating:
+        return sign * acceleration * t**2 / 2
+    covered = peak * accelerating / 2
+    if t <= accelerating + cruising:
+        return sign * (covered + peak * (t - accelerating))
+    covered += peak * cruising
+    t -= accelerating + cruising
+    stopping = peak / deceleration
+    if t >= stopping:
+        return sign * distance
+    return sign * (covered + peak * t - deceleration * t**2 / 2)
+
+
+def straight_duration(
+    distance: float,
+    motion,
+    speed: float | None = None,
+    acceleration=None,
+) -> float:
+    """How long `straight(distance)` takes with a `MotionConfig`, in ms."""
+    if speed is None:
+        speed = motion.straight_speed
+    if acceleration is None:
+        acceleration = motion.straight_acceleration
+    return profile_duration(distance, speed, *accelerations(acceleration))
+
+
+def turn_duration(
+    angle: float,
+    motion,
+    speed: float | None = None,
+    acceleration=None,
+) -> float:
+    """How long `turn(angle)` takes with a `MotionConfig`, in ms."""
+    if speed is None:
+        speed = motion.turn_rate
+    if acceleration is None:
+        acceleration = motion.turn_acceleration
+    return profile_duration(angle, speed, *accelerations(acceleration))
@@ -0,0 +1,259 @@
+"""Landmarks: field lines that correct the robot's pose as it drives over them.
+
+The mat has black lines parallel to its edges. When a color sensor crosses
+one, the robot knows exactly where that sensor is across the line: at the
+edge it reached first, half the line's width before its middle. So the x
+of a line along y, or the y of a line across it, can be snapped to the
+truth. When both sensors cross the same line during one straight, the
+difference between the distances at which they crossed gives the angle
+between the robot and the line, which squares the heading up without
+stopping or driving into a wall.
+
+Measure the middles of the lines on the real mat and hand them to the
+robot, with the width of any line that isn't `_LINE_WIDTH` wide:
+
+```
+LINES = (
+    landmarks.Line("west", 380, 0, 380, 600),
+    landmarks.Line("south", 900, 300, 1500, 300, width=10),
+)
+robot.use_landmarks(LINES)
+```
+
+From then on, every `straight` watches the sensors. Lines that the robot
+thinks are more than `_SNAP_DISTANCE` away are ignored, so it doesn't snap
+to the wrong one.
+"""
+
+from umath import atan2, degrees
+
+import geometry
+
+# Reflection below which a sensor is on a black line, in percent.
+_LINE_REFLECTION = 20
+
+# Default width of a line, in millimeters.
+_LINE_WIDTH = 20
+
+# How far a crossing may be from where the robot thinks the line is and
+# still be snapped to it, in millimeters.
+_SNAP_DISTANCE = 40
+
+
+class Line:
+    """A line on the mat, parallel to one of its edges."""
+
+    def __init__(
+        self,
+        name: str,
+        x0: float,
+        y0: float,
+        x1: float,
+        y1: float,
+        width: float = _LINE_WIDTH,
+    ):
+        if x0 != x1 and y0 != y1:
+            raise ValueError(
+                "Line " + name + " isn't parallel to an edge of the mat."
+            )
+        self.name = name
+        self.x0 = min(x0, x1)
+        self.y0 = min(y0, y1)
+        self.x1 = max(x0, x1)
+        self.y1 = max(y0, y1)
+        self.width = width
+        # A line along y fixes x, and a line along x fixes y.
+        self.fixes_x = x0 == x1
+
+    def offset(
+        self,
+        x: float,
+        y: float,
+        heading: float,
+    ) -> float | None:
+        """How far the near edge of the line is from (x, y), across it.
+
+        Args:
+            x: The x of the point.
+            y: The y of the point.
+            heading: The direction the point is moving in. The near edge is
+                the one it reaches first.
+
+        Returns: the signed distance from (x, y) to the near edge in x or y,
+          or None if (x, y) is beyond the ends of the line.
+        """
+        # Moving toward larger x or y, the near edge is the lower one.
+        edge = self.width / 2
+        if self.normal(heading) < 180:
+            edge = -edge
+        if self.fixes_x:
+            if not self.y0 - _SNAP_DISTANCE <= y <= self.y1 + _SNAP_DISTANCE:
+                return None
+            return self.x0 + edge - x
+        if not self.x0 - _SNAP_DISTANCE <= x <= self.x1 + _SNAP_DISTANCE:
+            return None
+        return self.y0 + edge - y
+
+    def normal(self, heading: float) -> float:
+        """The heading across the line that is closest to `heading`."""
+        across = 90 if self.fixes_x else 0
+        if abs(geometry.compute_turn(across, heading)) > 90:
+            across += 180
+        return across
+
+    def __repr__(self):
+        return (
+            f"Line({self.name!r}, {self.x0}, {self.y0}, " +
+            f"{self.x1}, {self.y1}, width={self.width})"
+        )
+
+
+class Relocalizer:
+    def __init__(
+        self,
+        left_sensor,
+        right_sensor,
+        lines,
+        sensor_forward: float,
+        sensor_spacing: float,
+    ):
+        """Watches the color sensors for lines during straights.
+
+        Args:
+            left_sensor: The left `ColorSensor`.
+            right_sensor: The right `ColorSensor`.
+            lines: The `Line`s on the mat.
+            sensor_forward: How far the sensors are ahead of the middle of
+                the axle, in millimeters.
+            sensor_spacing: How far apart the sensors are, in millimeters.
+        """
+        self.sensors = (left_sensor, right_sensor)
+        self.lines = lines
+        self.sensor_forward = sensor_forward
+        self.sensor_spacing = sensor_spacing
+        # Each sensor's offset to the right of the middle of the robot.
+        self._sides = (-sensor_spacing / 2, sensor_spacing / 2)
+        self.start(geometry.Pose(), 0)
+
+    def start(
+        self,
+        pose: geometry.Pose,
+        distance: float,
+    ):
+        """Starts watching a straight.
+
+        Args:
+            pose: Where the robot thinks it is at the start.
+            distance: The drive base's distance at the start.
+        """
+        self._x = pose.x
+        self._y = pose.y
+        self._heading = pose.heading
+        self._distance = distance
+        self._on_line = [
+            sensor.reflection() < _LINE_REFLECTION for sensor in self.sensors
+        ]
+        # The line each sensor crossed and the distance it crossed at.
+        self._crossings = [None, None]
+        # Whether a known line was crossed, and the corrections found so
+        # far: added to x and y, and the true heading.
+        self.crossed = False
+        self.dx = 0
+        self.dy = 0
+        self.heading = None
+
+    def update(self, distance: float) -> bool:
+        """Checks the sensors, given the drive base's distance now.
+
+        Returns: True if a sensor just crossed a known line.
+        """
+        found = False
+        for i in range(2):
+            on_line = self.sensors[i].reflection() < _LINE_REFLECTION
+            crossed = on_line and not self._on_line[i]
+            self._on_line[i] = on_line
+            if crossed and self._cross(i, distance):
+                found = True
+        return found
+
+    def _sensor(
+        self,
+        i: int,
+        distance: float,
+        heading: float,
+    ) -> tuple[float, float, float]:
+        """Where sensor `i` is at `distance`, driving straight at `heading`.
+
+        Returns: the x and y of the sensor, and the heading it is moving in.
+        """
+        forward = distance - self._distance
+        x, y, _ = geometry.compose_pose(
+            self._x,
+            self._y,
+            heading,
+            forward + self.sensor_forward,
+            self._sides[i],
+            0,
+        )
+        if forward < 0:
+            heading += 180
+        return x, y, heading
+
+    def _snap(self, line: Line, offset: float):
+        """Records the correction across `line`."""
+        if line.fixes_x:
+            self.dx = offset
+        else:
+            self.dy = offset
+
+    def _cross(self, i: int, distance: float) -> bool:
+        """Snaps to the line that sensor `i` is on, if there is one."""
+        x, y, heading = self._sensor(i, distance, self._heading)
+        nearest = None
+        for line in self.lines:
+            offset = line.offset(x, y, heading)
+            if (
+                offset is not None
+                and abs(offset) <= _SNAP_DISTANCE
+                and (nearest is None or abs(offset) < abs(nearest[1]))
+            ):
+                nearest = (line, offset)
+        if nearest is None:
+            return False
+        line, offset = nearest
+        self._snap(line, offset)
+        self.crossed = True
+        self._crossings[i] = (line, distance)
+        left, right = self._crossings
+        if left is not None and right is not None and left[0] is right[0]:
+            # The sensor ahead crossed first. Its lead over the other one
+            # is the spacing times the tangent of the angle to the line.
+            skew = degrees(atan2(right[1] - left[1], self.sensor_spacing))
+            self.heading = line.normal(self._heading) + skew
+            # The robot drove the whole straight at the true heading, so
+            # work out where this sensor crossed again with it.
+            x, y, heading = self._sensor(i, distance, self.heading)
+            offset = line.offset(x, y, heading)
+            if offset is not None:
+                self._snap(line, offset)
+        return True
+
+    def position(self, distance: float) -> tuple[float, float]:
+        """Where the middle of the axle is at `distance`, corrected.
+
+        Uses the true heading if both sensors crossed the same line, so the
+        whole straight is redone along it, not just the part across it.
+
+        Returns: the corrected x and y.
+        """
+        heading = self._heading if self.heading is None else self.heading
+        x, y = geometry.compute_new_position(
+            self._x, self._y, heading, distance - self._distance,
+        )
+        return x + self.dx, y + self.dy
+
+    def __repr__(self):
+        return (
+            f"Relocalizer(lines={len(self.lines)}, dx={self.dx}, " +
+            f"dy={self.dy}, heading={self.heading})"
+        )
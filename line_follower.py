@@ -0,0 +1,169 @@
+"""LineFollower: follows a line on the mat with the color sensors.
+
+```
+reason = robot.follow_line(distance=600, junction=True)
+```
+
+The loop runs at a fixed period, paced by a `Pacer`, and reads the
+reflection of the sensors each time. The steering for every possible
+reading is worked out once up front, so each step only looks up a turn
+rate in a table and passes it to `DriveBase.drive`. Nothing else is
+computed in the loop; `ArtemisBase.follow_line` tracks the pose with
+`Odometry.run` alongside it.
+
+There are two ways to follow:
+
+- With one sensor (`sensor=LEFT` or `RIGHT`), the sensor rides the `edge`
+  of the line, half on black and half on white. The other sensor is free to
+  look for junctions and colors.
+- With both sensors (`sensor=BOTH`), they straddle the line and the robot
+  steers toward the darker one.
+
+Following ends after `distance`, at a junction (the other sensor, or both
+sensors, over black) or when a sensor sees `color`, whichever comes first.
+"""
+
+from pacing import Pacer
+
+# Which sensor follows the line, and which edge of the line it follows.
+LEFT = "left"
+RIGHT = "right"
+BOTH = "both"
+
+# Why following ended.
+DISTANCE = "distance"
+JUNCTION = "junction"
+COLOR = "color"
+
+# Default time between steps, in milliseconds.
+_PERIOD_MS = 5
+
+
+def steering_table(
+    gain: float,
+    target: float,
+    max_turn_rate: float,
+    low: int = 0,
+    high: int = 100,
+) -> tuple:
+    """Turn rates for every error from `low` to `high`, as a tuple.
+
+    Entry `i` is the turn rate for an error of `low + i`: `gain` times how far
+    that is from `target`, limited to `max_turn_rate`, rounded to whole
+    degrees per second.
+    """
+    rates = []
+    for error in range(low, high + 1):
+        rate = gain * (error - target)
+        rate = max(-max_turn_rate, min(max_turn_rate, rate))
+        rates.append(int(round(rate)))
+    return tuple(rates)
+
+
+class LineFollower:
+    def __init__(
+        self,
+        robot,
+        config,
+    ):
+        """Creates a line follower.
+
+        Args:
+            robot: The `ArtemisBase` whose sensors and drive are used.
+            config: The `LineConfig` with the speed, gain and reflections.
+        """
+        self.robot = robot
+        self.config = config
+        # Below this reflection, a sensor is over the line.
+        self.dark = (config.black + config.white) / 2
+        # One sensor: reflection 0 to 100 to turn rate, for the right edge
+        # of the line. Too much white means too far right, so turn left.
+        right_edge = steering_table(
+            -config.gain, self.dark, config.max_turn_rate,
+        )
+        self.tables = {
+            RIGHT: right_edge,
+            LEFT: tuple(-rate for rate in right_edge),
+        }
+        # Both sensors: left minus right reflection, -100 to 100, to turn
+        # rate. The darker side is where the line is.
+        self.dual_table = steering_table(
+            config.gain, 0, config.max_turn_rate, -100, 100,
+        )
+
+    async def follow(
+        self,
+        speed: float | None = None,
+        distance: float | None = None,
+        sensor: str = BOTH,
+        edge: str = RIGHT,
+        junction: bool = False,
+        color=None,
+        period: float = _PERIOD_MS,
+    ) -> str:
+        """Follows the line until one of the stop conditions is met.
+
+        The robot is left driving; the caller decides how to stop it.
+
+        Args:
+            speed: The driving speed in mm/s, or None for the configured one.
+            distance: If set, stop after driving this far forward, in
+                millimeters.
+            sensor: LEFT or RIGHT to follow with one sensor, BOTH to follow
+                with both.
+            edge: With one sensor, the edge of the line to follow.
+            junction: Stop when the other sensor, or both sensors, are over
+                the line.
+            color: If set, stop when a sensor that isn't following sees this
+                `Color`. With both sensors following, either one.
+            period: The time between steps, in milliseconds.
+
+        Returns: why following stopped: DISTANCE, JUNCTION or COLOR.
+
+        Raises:
+            ValueError: If there is nothing to stop on.
+        """
+        if distance is None and not junction and color is None:
+            raise ValueError("Line following needs something to stop on.")
+        if speed is None:
+            speed = self.config.speed
+        robot = self.robot
+        drive = robot.drive
+        dark = self.dark
+        left = robot.left_color
+        right = robot.right_color
+        if sensor == BOTH:
+            table = self.dual_table
+            watched = (left, right)
+        else:
+            table = self.tables[edge]
+            follower, other = (left, right) if sensor == LEFT else (right, left)
+            watched = (other,)
+        start = robot.distance()
+        pacer = Pacer(period)
+        while True:
+            if sensor == BOTH:
+                left_reflection = left.reflection()
+                right_reflection = right.reflection()
+                if (
+                    junction
+                    and left_reflection < dark
+                    and right_reflection < dark
+                ):
+                    return JUNCTION
+                turn_rate = table[left_reflection - right_reflection + 100]
+            else:
+                turn_rate = table[follower.reflection()]
+                if junction and other.reflection() < dark:
+                    return JUNCTION
+            if distance is not None and robot.distance() - start >= distance:
+                return DISTANCE
+            if color is not None:
+                for watched_sensor in watched:
+                    if watched_sensor.color() == color:
+                        return COLOR
+            drive(speed, turn_rate)
+            await pacer.wait()
+
+    def __repr__(self):
+        return f"LineFollower({self.config})"
@@ -0,0 +1,362 @@
+"""Field map: the table, what's on it, and routes around it.
+
+Coordinates are in millimeters with (0, 0) in a corner of the mat, like the
+mission positions. Nothing is on the field by default, so add the mission
+models that are in the way as rectangles, measured on the real table:
+
+```
+field = map.Field()
+field.add_obstacle("shipwreck", 600, 0, 850, 60)
+field.add_zone("home", 1800, 0, 2362, 300)
+
+grid = map.OccupancyGrid(field, radius=map.footprint_radius(200, 170))
+waypoints = grid.plan((350, 140), (1225, 600))
+robot.drive_route(waypoints)
+```
+
+`OccupancyGrid` inflates every obstacle, and the walls, by the radius of
+the robot's footprint, so planning only has to keep the center of the robot
+on free cells. `plan` searches the grid with A* and then drops the
+waypoints that can be skipped by driving in a straight line, so the result
+is a short list of `drive_to` waypoints.
+
+Planning runs on the host, and the waypoints are pasted into missions.
+"""
+
+import heapq
+import math
+
+# Size of the mat, in millimeters.
+FIELD_WIDTH = 2362
+FIELD_HEIGHT = 1143
+
+# Default size of the grid cells, in millimeters.
+_CELL_MM = 20
+
+# The 8 neighbors of a cell and the cost of moving to them, in cells.
+_NEIGHBORS = (
+    (1, 0, 1.0),
+    (-1, 0, 1.0),
+    (0, 1, 1.0),
+    (0, -1, 1.0),
+    (1, 1, math.sqrt(2)),
+    (1, -1, math.sqrt(2)),
+    (-1, 1, math.sqrt(2)),
+    (-1, -1, math.sqrt(2)),
+)
+
+
+def footprint_radius(
+    length: float,
+    width: float,
+) -> float:
+    """The radius of the circle around a robot of `length` by `width`.
+
+    Assumes the robot turns about the center of its footprint.
+    """
+    return math.hypot(length, width) / 2
+
+
+class Region:
+    """An axis-aligned rectangle on the field."""
+
+    def __init__(
+        self,
+        name: str,
+        x0: float,
+        y0: float,
+        x1: float,
+        y1: float,
+    ):
+        self.name = name
+        self.x0 = min(x0, x1)
+        self.y0 = min(y0, y1)
+        self.x1 = max(x0, x1)
+        self.y1 = max(y0, y1)
+
+    def contains(
+        self,
+        x: float,
+        y: float,
+    ) -> bool:
+        return self.x0 <= x <= self.x1 and self.y0 <= y <= self.y1
+
+    def distance(
+        self,
+        x: float,
+        y: float,
+    ) -> float:
+        """Distance from (x, y) to the rectangle, 0 if inside it."""
+        dx = max(self.x0 - x, 0, x - self.x1)
+        dy = max(self.y0 - y, 0, y - self.y1)
+        return math.hypot(dx, dy)
+
+    def center(self) -> dict:
+        return {"x": (self.x0 + self.x1) / 2, "y": (self.y0 + self.y1) / 2}
+
+    def __repr__(self):
+        return (
+            f"Region(name={self.name!r}, x0={self.x0}, y0={self.y0}, " +
+            f"x1={self.x1}, y1={self.y1})"
+        )
+
+
+class Field:
+    def __init__(
+        self,
+        width: float = FIELD_WIDTH,
+        height: float = FIELD_HEIGHT,
+    ):
+        """Creates an empty field.
+
+        Args:
+            width: Size of the field along x, in millimeters.
+            height: Size of the field along y, in millimeters.
+        """
+        self.width = width
+        self.height = height
+        self.obstacles = []
+        self.zones = {}
+
+    def add_obstacle(
+        self,
+        name: str,
+        x0: float,
+        y0: float,
+        x1: float,
+        y1: float,
+    ) -> Region:
+        """Adds a rectangle the robot must not drive into."""
+        obstacle = Region(name, x0, y0, x1, y1)
+        self.obstacles.append(obstacle)
+        return obstacle
+
+    def add_zone(
+        self,
+        name: str,
+        x0: float,
+        y0: float,
+        x1: float,
+        y1: float,
+    ) -> Region:
+        """Adds a named area the robot can drive in, like home."""
+        zone = Region(name, x0, y0, x1, y1)
+        self.zones[name] = zone
+        return zone
+
+    def zone(self, name: str) -> Region:
+        return self.zones[name]
+
+    def in_bounds(
+        self,
+        x: float,
+        y: float,
+        margin: float = 0,
+    ) -> bool:
+        """Whether (x, y) is at least `margin` from the walls."""
+        return (
+            margin <= x <= self.width - margin
+            and margin <= y <= self.height - margin
+        )
+
+    def is_free(
+        self,
+        x: float,
+        y: float,
+        radius: float = 0,
+    ) -> bool:
+        """Whether a robot of `radius` centered at (x, y) fits."""
+        if not self.in_bounds(x, y, radius):
+            return False
+        return all(
+            obstacle.distance(x, y) > radius for obstacle in self.obstacles
+        )
+
+    def __repr__(self):
+        return (
+            f"Field(width={self.width}, height={self.height}, " +
+            f"obstacles={self.obstacles}, zones={list(self.zones.values())})"
+        )
+
+
+class OccupancyGrid:
+    def __init__(
+        self,
+        field: Field,
+        radius: float,
+        cell: float = _CELL_MM,
+    ):
+        """Rasterizes `field` for a robot with a footprint of `radius`.
+
+        Args:
+            field: The field to plan on.
+            radius: Radius of the robot's footprint, see `footprint_radius`.
+                Cells closer than this to an obstacle or wall are blocked.
+            cell: Size of the grid cells, in millimeters.
+        """
+        self.field = field
+        self.radius = radius
+        self.cell = cell
+        self.columns = int(field.width // cell) + 1
+        self.rows = int(field.height // cell) + 1
+        # One byte per cell, row by row: 1 if the robot can't be there.
+        self.blocked = bytearray(self.columns * self.rows)
+        for row in range(self.rows):
+            for column in range(self.columns):
+                x, y = self.to_point(column, row)
+                if not field.is_free(x, y, radius):
+                    self.blocked[row * self.columns + column] = 1
+
+    def to_cell(
+        self,
+        x: float,
+        y: float,
+    ) -> tuple[int, int]:
+        """The (column, row) of the cell nearest (x, y)."""
+        column = min(max(round(x / self.cell), 0), self.columns - 1)
+        row = min(max(round(y / self.cell), 0), self.rows - 1)
+        return column, row
+
+    def to_point(
+        self,
+        column: int,
+        row: int,
+    ) -> tuple[float, float]:
+        """The (x, y) of the center of a cell."""
+        return column * self.cell, row * self.cell
+
+    def is_blocked(
+        self,
+        column: int,
+        row: int,
+    ) -> bool:
+        if not (0 <= column < self.columns and 0 <= row < self.rows):
+            return True
+        return self.blocked[row * self.columns + column] == 1
+
+    def line_is_free(
+        self,
+        x0: float,
+        y0: float,
+        x1: float,
+        y1: float,
+    ) -> bool:
+        """Whether the robot can drive straight from (x0, y0) to (x1, y1)."""
+        steps = int(math.hypot(x1 - x0, y1 - y0) / (self.cell / 2)) + 1
+        for i in range(steps + 1):
+            t = i / steps
+            x = x0 + (x1 - x0) * t
+            y = y0 + (y1 - y0) * t
+            if not self.field.is_free(x, y, self.radius):
+                return False
+        return True
+
+    def _search(
+        self,
+        start: tuple[int, int],
+        goal: tuple[int, int],
+    ) -> list:
+        """A* from `start` to `goal`. Returns the cells, or None."""
+        columns = self.columns
+        goal_column, goal_row = goal
+
+        def heuristic(column, row):
+            # Octile distance, exact on an empty 8-connected grid.
+            dx = abs(column - goal_column)
+            dy = abs(row - goal_row)
+            return max(dx, dy) + (math.sqrt(2) - 1) * min(dx, dy)
+
+        start_index = start[1] * columns + start[0]
+        goal_index = goal_row * columns + goal_column
+        costs = {start_index: 0.0}
+        parents = {start_index: None}
+        queue = [(heuristic(*start), 0.0, start_index)]
+        while queue:
+            _, cost, index = heapq.heappop(queue)
+            if index == goal_index:
+                path = []
+                while index is not None:
+                    path.append((index % columns, index // columns))
+                    index = parents[index]
+                path.reverse()
+                return path
+            if cost > costs[index]:
+                # A cheaper way here was already expanded.
+                continue
+            column = index % columns
+            row = index // columns
+            for dx, dy, step in _NEIGHBORS:
+                next_column = column + dx
+                next_row = row + dy
+                if self.is_blocked(next_column, next_row):
+                    continue
+                if dx and dy and (
+                    self.is_blocked(column + dx, row)
+                    or self.is_blocked(column, row + dy)
+                ):
+                    # Don't cut corners between blocked cells.
+                    continue
+                next_index = next_row * columns + next_column
+                next_cost = cost + step
+                if next_cost < costs.get(next_index, math.inf):
+                    costs[next_index] = next_cost
+                    parents[next_index] = index
+                    heapq.heappush(
+                        queue,
+                        (
+                            next_cost + heuristic(next_column, next_row),
+                            next_cost,
+                            next_index,
+                        ),
+                    )
+        return None
+
+    def plan(
+        self,
+        start: tuple[float, float],
+        goal: tuple[float, float],
+    ) -> list:
+        """Plans a collision-free route from `start` to `goal`.
+
+        Args:
+            start: The (x, y) the robot starts from.
+            goal: The (x, y) to drive to.
+
+        Returns: the waypoints after `start` as `dict(x=..., y=...)`, ending
+          exactly at `goal`, for `ArtemisBase.drive_route` or `drive_to`.
+
+        Raises:
+            ValueError: If the start or goal is blocked, or there is no
+                route between them.
+        """
+        if not self.field.is_free(*start, self.radius):
+            raise ValueError(f"Start {start} is blocked.")
+        if not self.field.is_free(*goal, self.radius):
+            raise ValueError(f"Goal {goal} is blocked.")
+        if self.line_is_free(*start, *goal):
+            return [{"x": goal[0], "y": goal[1]}]
+        cells = self._search(self.to_cell(*start), self.to_cell(*goal))
+        if cells is None:
+            raise ValueError(f"No route from {start} to {goal}.")
+        points = [start] + [self.to_point(*cell) for cell in cells[1:-1]]
+        points.append(goal)
+        return [{"x": x, "y": y} for x, y in self._shortcut(points)[1:]]
+
+    def _shortcut(self, points: list) -> list:
+        """Drops the points that can be skipped by driving straight."""
+        kept = [points[0]]
+        i = 0
+        while i < len(points) - 1:
+            # The furthest point we can drive to straight from here.
+            j = len(points) - 1
+            while j > i + 1 and not self.line_is_free(*points[i], *points[j]):
+                j -= 1
+            kept.append(points[j])
+            i = j
+        return kept
+
+    def __repr__(self):
+        return (
+            f"OccupancyGrid(columns={self.columns}, rows={self.rows}, " +
+            f"cell={self.cell}, radius={self.radius})"
+        )
@@ -0,0 +1,412 @@
+"""Compiles missions into flat command tables.
+
+A mission's `run` method is traced with stand-ins for the robot and the
+attachment that record each call as a command instead of moving. Routes
+between static waypoints are resolved ahead of time, so `drive_to` becomes
+a turn to a fixed heading and a straight of a fixed distance. The result is
+a tuple of commands with `planner`'s op codes, which `ArtemisBase.run_table`
+runs on the hub with little overhead per step:
+
+```
+with fake_pybricks.installed():
+    import brush_map_mineshaft_statue as run
+
+tables = mission_compiler.compile_missions(
+    [run.SurfaceBrushing(), run.MapReveal(), run.Mineshaft()],
+    start=(350, 140, 0),
+)
+print(mission_compiler.estimate_time(tables["MapReveal"]))
+with open("tables.py", "w") as f:
+    f.write(mission_compiler.to_source(tables))
+```
+
+and on the hub:
+
+```
+from tables import TABLES
+
+runner.run([TableMission(name, table) for name, table in TABLES.items()])
+```
+
+Because the tables are plain data, host tools can also estimate how long
+they take and check their routes against the field map without running
+them.
+
+Missions are traced along a single path, so a mission whose moves depend on
+sensor readings can't be compiled. Nor can calls with a timeout, `during`
+actions or `wait=False`, or turns with `contact`, which a table can't
+express. Straights and `drive_to` with `contact` become CONTACT commands.
+"""
+
+import importlib
+import math
+import sys
+from unittest import mock
+
+import artemis_config
+import fake_pybricks
+import kinematics
+
+with mock.patch.dict(sys.modules, {"umath": math}):
+    import geometry
+    import planner
+
+with fake_pybricks.installed():
+    import alpha
+
+# Acceleration of the attachment motors in deg/s², like `fake_pybricks`.
+_ARM_ACCELERATION = 2000
+
+
+def _check_plain(
+    name: str,
+    timeout=None,
+    during=(),
+    wait=True,
+    then=None,
+    contact=False,
+):
+    if timeout is not None or during or not wait or contact:
+        raise ValueError(
+            f"{name} with a timeout, during actions, contact or wait=False "
+            "can't be compiled."
+        )
+    if then not in (None, fake_pybricks.Stop.HOLD):
+        raise ValueError(f"{name} with then={then} can't be compiled.")
+
+
+def _move(op, value, x, y, speed, acceleration) -> tuple:
+    if op == planner.TURN:
+        if speed is None and acceleration is None:
+            return (planner.TURN, value)
+        return (planner.TURN, value, speed, acceleration)
+    if speed is None and acceleration is None:
+        return (op, value, x, y)
+    return (op, value, x, y, speed, acceleration)
+
+
+class _RecordingRobot:
+    """Stands in for `ArtemisBase`, recording moves as commands."""
+
+    def __init__(
+        self,
+        x: float,
+        y: float,
+        heading: float,
+        config: artemis_config.ArtemisConfig,
+    ):
+        self.x = x
+        self.y = y
+        self.heading = heading
+        self.config = config
+        self.commands = []
+
+    def angle(self) -> float:
+        return self.heading
+
+    def reset_position(self, x: float = 0, y: float = 0):
+        self.x = x
+        self.y = y
+        self.commands.append((planner.RESET, x, y))
+
+    def turn_to(
+        self,
+        heading: float,
+        then=None,
+        wait: bool = True,
+        speed: float | None = None,
+        acceleration=None,
+        timeout: float | None = None,
+        during=(),
+        contact: bool = False,
+    ):
+        _check_plain("turn_to", timeout, during, wait, then, contact)
+        self.heading = heading
+        self.commands.append(
+            _move(planner.TURN, heading, None, None, speed, acceleration)
+        )
+
+    def straight(
+        self,
+        distance: float,
+        then=None,
+        wait: bool = True,
+        speed: float | None = None,
+        acceleration=None,
+        timeout: float | None = None,
+        during=(),
+        contact: bool = False,
+    ):
+        _check_plain("straight", timeout, during, wait, then)
+        self.x, self.y = geometry.compute_new_position(
+            self.x, self.y, self.heading, distance,
+        )
+        op = planner.CONTACT if contact else planner.STRAIGHT
+        self.commands.append(
+            _move(op, distance, self.x, self.y, speed, acceleration)
+        )
+
+    def drive_to(
+        self,
+        x: float,
+        y: float,
+        then=None,
+        wait: bool = True,
+        gear: str = planner.Gear.FWD,
+        timeout: float | None = None,
+        during=(),
+        contact: bool = False,
+    ):
+        _check_plain("drive_to", timeout, during, wait, then)
+        heading, distance = geometry.compute_trajectory(self.x, self.y, x, y)
+        if gear == planner.Gear.REV:
+            heading += 180
+            distance = -distance
+        self.turn_to(heading)
+        op = planner.CONTACT if contact else planner.STRAIGHT
+        self.commands.append((op, distance, x, y))
+        self.x = x
+        self.y = y
+
+    def drive_route(self, waypoints: list, then=None):
+        _check_plain("drive_route", then=then)
+        control = self.config
+        commands = planner.compile_route(
+            self.x,
+            self.y,
+            self.heading,
+            waypoints,
+            heading_tolerance=(
+                control.turn_control_config.heading_tolerance.position
+            ),
+            min_distance=(
+                control.straight_control_config.distance_tolerance.position
+            ),
+        )
+        for command in commands:
+            if command[0] == planner.TURN:
+                self.heading = command[1]
+            else:
+                self.x, self.y = command[2], command[3]
+        self.commands.extend(commands)
+
+
+class _RecordingAttachment:
+    """Stands in for `AttachmentAlpha`, recording arm moves as commands."""
+
+    def __init__(self, commands: list):
+        self.commands = commands
+
+    def left_arm_move(self, speed, position, then=None, wait=True):
+        _check_plain("left_arm_move", wait=wait, then=then)
+        self.commands.append((planner.LEFT_ARM, speed, position))
+
+    def right_arm_move(self, speed, position, then=None, wait=True):
+        _check_plain("right_arm_move", wait=wait, then=then)
+        self.commands.append((planner.RIGHT_ARM, speed, position))
+
+    def move_to_pose(
+        self,
+        pose=None,
+        left=None,
+        right=None,
+        speed=alpha._ARM_SPEED,
+        sync=True,
+        then=None,
+    ):
+        _check_plain("move_to_pose", then=then)
+        if not sync:
+            raise ValueError("move_to_pose with sync=False can't be compiled.")
+        if pose is not None:
+            pose_left, pose_right = alpha.POSES[pose]
+            if left is None:
+                left = pose_left
+            if right is None:
+                right = pose_right
+        self.commands.append((planner.ARMS, speed, left, right))
+
+
+def compile_mission(
+    mission,
+    start: tuple[float, float, float],
+    config: artemis_config.ArtemisConfig | None = None,
+) -> tuple[tuple, tuple[float, float, float]]:
+    """Traces `mission.run` into a command table.
+
+    Args:
+        mission: The mission, with a `run(robot, attachment)` method. Its
+            module must have been imported with `fake_pybricks.installed()`.
+        start: The (x, y, heading) the robot is at when the mission starts.
+        config: The robot configuration, for `drive_route` tolerances.
+
+    Returns: (table, (x, y, heading) at the end of the mission).
+
+    Raises:
+        ValueError: If the mission makes a call a table can't express.
+    """
+    if config is None:
+        config = artemis_config.ArtemisConfig.default()
+    robot = _RecordingRobot(*start, config)
+    attachment = _RecordingAttachment(robot.commands)
+    module = sys.modules[type(mission).__module__]
+
+    def record_wait(time):
+        robot.commands.append((planner.WAIT, time))
+
+    if hasattr(module, "wait"):
+        with mock.patch.object(module, "wait", record_wait):
+            mission.run(robot, attachment)
+    else:
+        mission.run(robot, attachment)
+    return tuple(robot.commands), (robot.x, robot.y, robot.heading)
+
+
+def compile_missions(
+    missions,
+    start: tuple[float, float, float],
+    config: artemis_config.ArtemisConfig | None = None,
+) -> dict:
+    """Compiles missions that run one after the other.
+
+    Returns: the table of each mission, by class name, in order.
+    """
+    tables = {}
+    pose = start
+    for mission in missions:
+        table, pose = compile_mission(mission, pose, config)
+        tables[type(mission).__name__] = table
+    return tables
+
+
+def estimate_time(
+    table,
+    heading: float = 0,
+    config: artemis_config.ArtemisConfig | None = None,
+) -> float:
+    """Estimates how long a table takes to run, in milliseconds.
+
+    Args:
+        table: The commands.
+        heading: The heading the robot starts with.
+        config: The robot configuration, for speeds and accelerations.
+
+    Like `fake.Base`, this doesn't count time spent settling at the end of
+    moves. Arms are assumed to start where `AttachmentAlpha.init` leaves
+    them.
+    """
+    if config is None:
+        config = artemis_config.ArtemisConfig.default()
+    motion = config.motion_config
+    arms = {planner.LEFT_ARM: 0, planner.RIGHT_ARM: 0}
+    # Motor degrees per percent of each arm's travel.
+    scales = {
+        planner.LEFT_ARM: alpha._LEFT_ARM_DOWN_ANGLE / 100,
+        planner.RIGHT_ARM: alpha._RIGHT_ARM_DOWN_ANGLE / 100,
+    }
+
+    def move_arm(arm, speed, position) -> float:
+        if position is None:
+            return 0
+        angle = position * scales[arm]
+        duration = kinematics.profile_duration(
+            angle - arms[arm], speed, _ARM_ACCELERATION,
+        )
+        arms[arm] = angle
+        return duration
+
+    total = 0.0
+    for command in table:
+        op = command[0]
+        if op == planner.TURN:
+            speed = acceleration = None
+            if len(command) > 2:
+                speed, acceleration = command[2], command[3]
+            turn = geometry.compute_turn(heading, command[1])
+            total += kinematics.turn_duration(turn, motion, speed, acceleration)
+            heading = command[1]
+        elif op in (planner.STRAIGHT, planner.CONTACT):
+            speed = acceleration = None
+            if len(command) > 4:
+                speed, acceleration = command[4], command[5]
+            total += kinematics.straight_duration(
+                command[1], motion, speed, acceleration,
+            )
+        elif op in arms:
+            total += move_arm(op, command[1], command[2])
+        elif op == planner.ARMS:
+            # Both arms move at once and arrive together.
+            total += max(
+                move_arm(planner.LEFT_ARM, command[1], command[2]),
+                move_arm(planner.RIGHT_ARM, command[1], command[3]),
+            )
+        elif op == planner.WAIT:
+            total += command[1]
+    return total
+
+
+def check_route(
+    table,
+    grid,
+    x: float,
+    y: float,
+) -> list:
+    """Checks the straights of a table against a field map.
+
+    Args:
+        table: The commands.
+        grid: A `map.OccupancyGrid` for the robot.
+        x: The x position the robot starts from.
+        y: The y position the robot starts from.
+
+    Returns: a list of (index of the command, message), empty if the route
+      is clear.
+    """
+    problems = []
+    for i, command in enumerate(table):
+        op = command[0]
+        if op in (planner.STRAIGHT, planner.CONTACT):
+            if not grid.line_is_free(x, y, command[2], command[3]):
+                problems.append(
+                    (i, f"({x:.0f}, {y:.0f}) to "
+                        f"({command[2]:.0f}, {command[3]:.0f}) is blocked")
+                )
+            x, y = command[2], command[3]
+        elif op == planner.RESET:
+            x, y = command[1], command[2]
+    return problems
+
+
+def to_source(tables: dict) -> str:
+    """Python source defining `TABLES`, to copy to the hub."""
+    lines = [
+        '"""Command tables generated by mission_compiler."""',
+        "",
+        "TABLES = {",
+    ]
+    for name, table in tables.items():
+        lines.append(f"    {name!r}: (")
+        for command in table:
+            values = ", ".join(
+                f"{value:.6g}" if isinstance(value, float) else repr(value)
+                for value in command
+            )
+            lines.append(f"        ({values}),")
+        lines.append("    ),")
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def main():
+    module_name, *names = sys.argv[1:]
+    with fake_pybricks.installed():
+        module = importlib.import_module(module_name)
+        missions = [getattr(module, name)() for name in names]
+        start = missions[0].start
+        tables = compile_missions(missions, (start["x"], start["y"], 0))
+    for name, table in tables.items():
+        print(f"{name}: {len(table)} commands, {estimate_time(table):.0f} ms")
+    print(to_source(tables))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,642 @@
+"""Picks the order to run missions in so that the robot drives the least.
+
+Each mission class has a `start` and an `end` position. `read_missions`
+runs every mission on the `fake_pybricks` simulator to estimate how long it
+takes and which way the robot faces when it's done, and `solve` orders the
+missions to minimize the time spent driving between them:
+
+```
+missions = mission_order.read_missions(
+    "sand_ship_bucket_flip", ["SandPull", "ShipPush", "BucketFlip", "HoopPull"],
+)
+plan = mission_order.solve(
+    missions,
+    start=(350, 140, 0),
+    home=(1980, 120),
+    precedence=[("SandPull", "ShipPush")],
+)
+print(plan)
+```
+
+or from the command line, starting from the first mission's start:
+
+```
+python mission_order.py sand_ship_bucket_flip SandPull ShipPush BucketFlip
+```
+
+Missions that depend on where another one left something list it in
+`precedence`, or in an `after` tuple of mission names on the class.
+
+When a run is too long for the match, `select` picks the subset of missions
+and the order that score the most expected points while fitting in the time
+budget with a margin for the variation in mission times, and `write_runner`
+writes it out as a program:
+
+```
+missions = mission_order.with_timings(missions, {"SandPull": [6900, 7200]})
+plan = mission_order.select(missions, start=(350, 140, 0), budget=60_000)
+mission_order.write_runner(
+    "runner.py", plan, "sand_ship_bucket_flip", missions, (350, 140, 0),
+    budget=60_000,
+)
+```
+
+Transit times are estimated as a turn to face the next start followed by a
+straight, like `drive_to`. Up to `_EXACT_LIMIT` missions are ordered exactly
+with dynamic programming over subsets (Held-Karp). Beyond that, the order
+starts from nearest neighbors and is improved with 2-opt and by moving
+single missions until nothing helps.
+"""
+
+import importlib
+import math
+import sys
+from unittest import mock
+
+import artemis_config
+import fake_pybricks
+import kinematics
+
+with mock.patch.dict(sys.modules, {"umath": math}):
+    import geometry
+
+with fake_pybricks.installed():
+    from mission_runner import MATCH_MS
+
+# Largest number of missions to order exactly. The time and memory grow as
+# 2**n * n**2.
+_EXACT_LIMIT = 13
+
+
+class MissionInfo:
+    def __init__(
+        self,
+        name: str,
+        start: tuple[float, float],
+        end: tuple[float, float],
+        duration: float,
+        end_heading: float = 0,
+        after=(),
+        points: float = 0,
+        duration_std: float = 0,
+    ):
+        """What the order solver needs to know about a mission.
+
+        Args:
+            name: The mission's name, usually its class name.
+            start: The (x, y) the mission starts from.
+            end: The (x, y) the mission ends at.
+            duration: How long the mission takes, in milliseconds, not
+                counting the drive to its start.
+            end_heading: The heading the robot faces at the end.
+            after: Names of missions that must run before this one.
+            points: The points the mission is expected to score, e.g. its
+                points times how often it succeeds. Only used by `select`.
+            duration_std: Standard deviation of `duration`, in ms, e.g.
+                from `with_timings`. Only used by `select`.
+        """
+        self.name = name
+        self.start = start
+        self.end = end
+        self.duration = duration
+        self.end_heading = end_heading
+        self.after = tuple(after)
+        self.points = points
+        self.duration_std = duration_std
+
+    def __repr__(self):
+        return (
+            f"MissionInfo(name={self.name!r}, start={self.start}, " +
+            f"end={self.end}, duration={self.duration:.0f}, " +
+            f"end_heading={self.end_heading:.0f}, after={self.after}, " +
+            f"points={self.points}, duration_std={self.duration_std:.0f})"
+        )
+
+
+def _position(position) -> tuple[float, float]:
+    if isinstance(position, dict):
+        return position["x"], position["y"]
+    return position[0], position[1]
+
+
+def read_missions(
+    module_name: str,
+    names: list[str],
+) -> list[MissionInfo]:
+    """Measures missions by running each one on the simulator.
+
+    Each mission is run from its `start`, facing heading 0, after the
+    module's `init()`. Its end is the class's `end` if it has one, and
+    otherwise wherever the robot thinks it is after the run. Its points
+    are the class's `points`, if it has them.
+
+    Missions without a `start`, like a `GoHome` that drives back from
+    wherever the robot is, can't be placed in an order, so they are skipped
+    with a message.
+
+    Args:
+        module_name: The mission module, like "sand_ship_bucket_flip".
+        names: The names of the mission classes in the module.
+    """
+    fake_pybricks.reset()
+    missions = []
+    with fake_pybricks.installed():
+        module = importlib.import_module(module_name)
+        hub, robot, attachment = module.init()
+        for name in names:
+            mission = getattr(module, name)()
+            if getattr(mission, "start", None) is None:
+                print(
+                    f"Skipping {name}: it has no start to order it by.",
+                    file=sys.stderr,
+                )
+                continue
+            start = _position(mission.start)
+            robot.reset(0, 0)
+            robot.reset_position(*start)
+            begin = fake_pybricks.clock.now
+            mission.run(robot, attachment)
+            duration = fake_pybricks.clock.now - begin
+            end = getattr(mission, "end", None)
+            end = (robot.x, robot.y) if end is None else _position(end)
+            missions.append(
+                MissionInfo(
+                    name,
+                    start,
+                    end,
+                    duration,
+                    end_heading=robot.angle(),
+                    after=getattr(mission, "after", ()),
+                    points=getattr(mission, "points", 0),
+                )
+            )
+    return missions
+
+
+def transit_time(
+    x0: float,
+    y0: float,
+    heading: float,
+    x1: float,
+    y1: float,
+    motion: artemis_config.MotionConfig,
+) -> tuple[float, float]:
+    """Estimates `drive_to(x1, y1)` from (x0, y0) facing `heading`.
+
+    Returns: (time in ms, heading on arrival).
+    """
+    new_heading, distance = geometry.compute_trajectory(x0, y0, x1, y1)
+    if distance == 0:
+        return 0, heading
+    turn = geometry.compute_turn(heading, new_heading)
+    time = kinematics.turn_duration(turn, motion) + kinematics.straight_duration(
+        distance, motion,
+    )
+    return time, new_heading
+
+
+class Plan:
+    """An order of missions and how long it takes."""
+
+    def __init__(
+        self,
+        order: list[str],
+        transit: float,
+        missions: float,
+        points: float = 0,
+        std: float = 0,
+    ):
+        self.order = order
+        self.transit = transit
+        self.missions = missions
+        self.points = points
+        # Standard deviation of the total time.
+        self.std = std
+
+    @property
+    def total(self) -> float:
+        return self.transit + self.missions
+
+    def __repr__(self):
+        return (
+            f"Plan(order={self.order}, transit={self.transit:.0f}, " +
+            f"missions={self.missions:.0f}, total={self.total:.0f}, " +
+            f"points={self.points}, std={self.std:.0f})"
+        )
+
+
+def _cost_matrix(missions, start, home, motion):
+    """Transit times between missions.
+
+    Row and column `n` is the start, and column `n` is also where the robot
+    goes after the last mission (home), so every order is a cycle.
+    """
+    n = len(missions)
+    costs = [[0.0] * (n + 1) for _ in range(n + 1)]
+    for i in range(n + 1):
+        if i == n:
+            x0, y0, heading = start
+        else:
+            x0, y0 = missions[i].end
+            heading = missions[i].end_heading
+        for j in range(n):
+            if i != j:
+                costs[i][j], _ = transit_time(
+                    x0, y0, heading, *missions[j].start, motion,
+                )
+        if home is not None and i != n:
+            costs[i][n], _ = transit_time(x0, y0, heading, *home, motion)
+    return costs
+
+
+def _predecessors(missions, precedence) -> list[int]:
+    """A bit mask, for each mission, of the missions that must come first."""
+    index = {mission.name: i for i, mission in enumerate(missions)}
+    masks = [0] * len(missions)
+    pairs = list(precedence)
+    for mission in missions:
+        pairs.extend((before, mission.name) for before in mission.after)
+    for before, after in pairs:
+        if before in index and after in index:
+            masks[index[after]] |= 1 << index[before]
+    return masks
+
+
+def _order_cost(order, costs) -> float:
+    n = len(costs) - 1
+    total = 0.0
+    previous = n
+    for i in order:
+        total += costs[previous][i]
+        previous = i
+    return total + costs[previous][n]
+
+
+def _is_feasible(order, predecessors) -> bool:
+    done = 0
+    for i in order:
+        if predecessors[i] & ~done:
+            return False
+        done |= 1 << i
+    return True
+
+
+def _subset_table(costs, predecessors):
+    """Held-Karp dynamic programming over subsets of missions.
+
+    Returns: (best, parent). `best[mask][last]` is the least transit time
+      to run the missions in the bit mask `mask`, ending with `last`, and
+      `parent[mask][last]` is the mission before `last` on that route.
+    """
+    n = len(costs) - 1
+    full = (1 << n) - 1
+    inf = math.inf
+    best = [[inf] * n for _ in range(1 << n)]
+    parent = [[-1] * n for _ in range(1 << n)]
+    for j in range(n):
+        if predecessors[j] == 0:
+            best[1 << j][j] = costs[n][j]
+    for mask in range(1, full + 1):
+        row = best[mask]
+        for last in range(n):
+            cost = row[last]
+            if cost == inf:
+                continue
+            for j in range(n):
+                bit = 1 << j
+                if mask & bit or predecessors[j] & ~mask:
+                    continue
+                new_cost = cost + costs[last][j]
+                if new_cost < best[mask | bit][j]:
+                    best[mask | bit][j] = new_cost
+                    parent[mask | bit][j] = last
+    return best, parent
+
+
+def _unwind(parent, mask: int, last: int) -> list[int]:
+    """The order of the missions in `mask` that ends with `last`."""
+    order = []
+    while last != -1:
+        order.append(last)
+        last, mask = parent[mask][last], mask & ~(1 << last)
+    order.reverse()
+    return order
+
+
+def _solve_exact(costs, predecessors) -> list[int]:
+    n = len(costs) - 1
+    full = (1 << n) - 1
+    best, parent = _subset_table(costs, predecessors)
+    last = min(range(n), key=lambda j: best[full][j] + costs[j][n])
+    if best[full][last] == math.inf:
+        raise ValueError("The precedence constraints have a cycle.")
+    return _unwind(parent, full, last)
+
+
+def _solve_heuristic(costs, predecessors) -> list[int]:
+    """Nearest neighbors, then 2-opt and moving single missions."""
+    n = len(costs) - 1
+    order = []
+    done = 0
+    previous = n
+    for _ in range(n):
+        candidates = [
+            j for j in range(n)
+            if not done & (1 << j) and not predecessors[j] & ~done
+        ]
+        if not candidates:
+            raise ValueError("The precedence constraints have a cycle.")
+        j = min(candidates, key=lambda j: costs[previous][j])
+        order.append(j)
+        done |= 1 << j
+        previous = j
+
+    best = _order_cost(order, costs)
+    improved = True
+    while improved:
+        improved = False
+        for i in range(n - 1):
+            for k in range(i + 1, n):
+                # 2-opt: reverse order[i:k + 1].
+                candidate = order[:i] + order[i : k + 1][::-1] + order[k + 1 :]
+                cost = _order_cost(candidate, costs)
+                if cost < best and _is_feasible(candidate, predecessors):
+                    order, best, improved = candidate, cost, True
+        for i in range(n):
+            for k in range(n):
+                if i == k:
+                    continue
+                # Move the mission at i to k.
+                candidate = order[:i] + order[i + 1 :]
+                candidate.insert(k, order[i])
+                cost = _order_cost(candidate, costs)
+                if cost < best and _is_feasible(candidate, predecessors):
+                    order, best, improved = candidate, cost, True
+    return order
+
+
+def solve(
+    missions: list[MissionInfo],
+    start: tuple[float, float, float],
+    home: tuple[float, float] | None = None,
+    precedence=(),
+    motion: artemis_config.MotionConfig | None = None,
+) -> Plan:
+    """Finds the order of missions with the least time spent driving.
+
+    Args:
+        missions: The missions to run, see `read_missions`.
+        start: The (x, y, heading) the robot starts from.
+        home: If set, the (x, y) to drive to after the last mission.
+        precedence: Pairs of (before, after) mission names, on top of the
+            missions' own `after` lists.
+        motion: The robot's motion settings, for transit times.
+
+    Raises:
+        ValueError: If the precedence constraints can't all be met.
+    """
+    if motion is None:
+        motion = artemis_config.ArtemisConfig.default().motion_config
+    if not missions:
+        return Plan([], 0, 0)
+    costs = _cost_matrix(missions, start, home, motion)
+    predecessors = _predecessors(missions, precedence)
+    if len(missions) <= _EXACT_LIMIT:
+        order = _solve_exact(costs, predecessors)
+    else:
+        order = _solve_heuristic(costs, predecessors)
+    return Plan(
+        [missions[i].name for i in order],
+        _order_cost(order, costs),
+        sum(mission.duration for mission in missions),
+    )
+
+
+def evaluate(
+    missions: list[MissionInfo],
+    start: tuple[float, float, float],
+    home: tuple[float, float] | None = None,
+    motion: artemis_config.MotionConfig | None = None,
+) -> Plan:
+    """Times the missions in the order given, for comparison with `solve`."""
+    if motion is None:
+        motion = artemis_config.ArtemisConfig.default().motion_config
+    costs = _cost_matrix(missions, start, home, motion)
+    order = list(range(len(missions)))
+    return Plan(
+        [mission.name for mission in missions],
+        _order_cost(order, costs),
+        sum(mission.duration for mission in missions),
+    )
+
+
+def with_timings(
+    missions: list[MissionInfo],
+    runs: dict,
+) -> list[MissionInfo]:
+    """Sets the missions' durations from measured runs.
+
+    Args:
+        missions: The missions, e.g. from `read_missions`.
+        runs: Lists of measured durations in ms, by mission name, e.g. from
+            hub logs. Missions with fewer than two runs keep their duration
+            and standard deviation.
+
+    Returns: the same missions, updated in place.
+    """
+    for mission in missions:
+        times = runs.get(mission.name, ())
+        if len(times) < 2:
+            continue
+        mean = sum(times) / len(times)
+        variance = sum((t - mean) ** 2 for t in times) / (len(times) - 1)
+        mission.duration = mean
+        mission.duration_std = math.sqrt(variance)
+    return missions
+
+
+def _fits(total: float, variance: float, budget: float, margin: float):
+    return total + margin * math.sqrt(variance) <= budget
+
+
+def _select_exact(missions, costs, predecessors, budget, margin):
+    n = len(missions)
+    best, parent = _subset_table(costs, predecessors)
+    durations = [0.0] * (1 << n)
+    variances = [0.0] * (1 << n)
+    points = [0.0] * (1 << n)
+    chosen = (0, 0.0, [])
+    for mask in range(1, 1 << n):
+        # Sums over the mask, from the mask without its lowest mission.
+        low = (mask & -mask).bit_length() - 1
+        rest = mask & (mask - 1)
+        durations[mask] = durations[rest] + missions[low].duration
+        variances[mask] = variances[rest] + missions[low].duration_std**2
+        points[mask] = points[rest] + missions[low].points
+        if points[mask] < chosen[0]:
+            continue
+        for last in range(n):
+            transit = best[mask][last]
+            if transit == math.inf:
+                continue
+            total = durations[mask] + transit + costs[last][n]
+            if not _fits(total, variances[mask], budget, margin):
+                continue
+            key = (points[mask], -total)
+            if not chosen[2] or key > (chosen[0], -chosen[1]):
+                chosen = (points[mask], total, (mask, last))
+    if not chosen[2]:
+        return []
+    return _unwind(parent, *chosen[2])
+
+
+def _select_heuristic(missions, costs, predecessors, budget, margin):
+    """Drops the missions with the fewest points per second until it fits."""
+    n = len(missions)
+    chosen = list(range(n))
+    while chosen:
+        rows = chosen + [n]
+        sub_costs = [[costs[a][b] for b in rows] for a in rows]
+        position = {i: k for k, i in enumerate(chosen)}
+        sub_predecessors = [0] * len(chosen)
+        for k, i in enumerate(chosen):
+            for j in chosen:
+                if predecessors[i] & (1 << j):
+                    sub_predecessors[k] |= 1 << position[j]
+        order = _solve_heuristic(sub_costs, sub_predecessors)
+        total = _order_cost(order, sub_costs) + sum(
+            missions[i].duration for i in chosen
+        )
+        variance = sum(missions[i].duration_std**2 for i in chosen)
+        if _fits(total, variance, budget, margin):
+            return [chosen[k] for k in order]
+        # Only drop missions that no other chosen mission depends on.
+        needed = 0
+        for i in chosen:
+            needed |= predecessors[i]
+        droppable = [i for i in chosen if not needed & (1 << i)]
+        worst = min(
+            droppable,
+            key=lambda i: missions[i].points / max(missions[i].duration, 1),
+        )
+        chosen.remove(worst)
+    return []
+
+
+def select(
+    missions: list[MissionInfo],
+    start: tuple[float, float, float],
+    budget: float = MATCH_MS,
+    home: tuple[float, float] | None = None,
+    precedence=(),
+    margin: float = 1.0,
+    motion: artemis_config.MotionConfig | None = None,
+) -> Plan:
+    """Picks the missions and order that score the most within `budget`.
+
+    A plan fits if its expected time plus `margin` standard deviations is
+    within the budget. Among the plans with the most points, the fastest
+    one is picked. A mission is only picked if the missions it depends on
+    are too.
+
+    Args:
+        missions: The candidate missions, with `points` and durations.
+        start: The (x, y, heading) the robot starts from.
+        budget: The time available, in milliseconds.
+        home: If set, the (x, y) to drive to after the last mission.
+        precedence: Pairs of (before, after) mission names.
+        margin: How many standard deviations of time to keep in reserve.
+        motion: The robot's motion settings, for transit times.
+    """
+    if motion is None:
+        motion = artemis_config.ArtemisConfig.default().motion_config
+    if not missions:
+        return Plan([], 0, 0)
+    costs = _cost_matrix(missions, start, home, motion)
+    predecessors = _predecessors(missions, precedence)
+    if len(missions) <= _EXACT_LIMIT:
+        order = _select_exact(missions, costs, predecessors, budget, margin)
+    else:
+        order = _select_heuristic(
+            missions, costs, predecessors, budget, margin,
+        )
+    chosen = [missions[i] for i in order]
+    return Plan(
+        [mission.name for mission in chosen],
+        _order_cost(order, costs) if order else 0,
+        sum(mission.duration for mission in chosen),
+        points=sum(mission.points for mission in chosen),
+        std=math.sqrt(sum(mission.duration_std**2 for mission in chosen)),
+    )
+
+
+def write_runner(
+    path: str,
+    plan: Plan,
+    module_name: str,
+    missions: list[MissionInfo],
+    start: tuple[float, float, float],
+    home: tuple[float, float] | None = None,
+    budget: float = MATCH_MS,
+):
+    """Writes a program that runs the missions of `plan` in order.
+
+    The program calls the module's `init()` and runs the missions with a
+    `MissionRunner`. Before each mission that doesn't begin where the last
+    one ended, it drives to the mission's start, like the transits `select`
+    plans for.
+
+    Args:
+        path: Where to write the program.
+        plan: The plan, from `select` or `solve`.
+        module_name: The module the mission classes are in.
+        missions: The missions the plan was made from.
+        start: The (x, y, heading) the robot starts from.
+        home: If set, the (x, y) to drive to after the last mission.
+        budget: The time available for all the missions, in milliseconds,
+            passed to the runner as its `match_budget`.
+    """
+    by_name = {mission.name: mission for mission in missions}
+    names = ", ".join(sorted(plan.order) + ["init"])
+    lines = [
+        f'"""Generated by mission_order.write_runner: {plan.points:g} points',
+        f'in {plan.total / 1000:.1f} s, give or take {plan.std / 1000:.1f} s."""',
+        "",
+        f"from {module_name} import {names}",
+        "from mission_runner import DriveTo, MissionRunner",
+        "",
+        'if __name__ == "__main__":',
+        "    hub, robot, attachment = init()",
+        f"    runner = MissionRunner(robot, attachment, match_budget={budget:g})",
+        "    runner.run(",
+        "        [",
+    ]
+    position = start[:2]
+    for name in plan.order:
+        mission = by_name[name]
+        if tuple(mission.start) != tuple(position):
+            x, y = mission.start
+            lines.append(f"            DriveTo({x:g}, {y:g}),")
+        lines.append(f"            {name}(),")
+        position = mission.end
+    if home is not None:
+        lines.append(f"            DriveTo({home[0]:g}, {home[1]:g}),")
+    lines += ["        ]", "    )"]
+    with open(path, "w") as f:
+        f.write("\n".join(lines) + "\n")
+
+
+def main():
+    module_name, *names = sys.argv[1:]
+    missions = read_missions(module_name, names)
+    if not missions:
+        sys.exit("None of the missions has a start.")
+    for mission in missions:
+        print(mission)
+    x, y = missions[0].start
+    print("Given:", evaluate(missions, (x, y, 0)))
+    print("Best: ", solve(missions, (x, y, 0)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""MissionRunner: runs a list of missions, timing each one.
+
+```
+hub, robot, attachment = init()
+runner = MissionRunner(robot, attachment, match_budget=MATCH_MS)
+runner.run([SandPull(), ShipPush(), BucketFlip(), HoopPull(), GoHome()])
+```
+
+A mission is an object with a `run(robot, attachment)` method. It can also
+have a `budget`, the most time it may take in milliseconds.
+
+Missions that also have an async `run_async(robot, attachment)` method are
+run with it instead, raced against their budget with `multitask` like
+`ArtemisBase._straight_with_timeout`. When the budget runs out, the drive
+base and the attachment are stopped and the robot's pose is taken from its
+odometry, since it never reached the target of the move it was making.
+
+`DriveTo` and `TableMission` have one, and so do the missions that push
+or lift field models, which are the ones that can get stuck. Plain
+missions can't be interrupted: they run to the end and are marked over
+budget if they took too long.
+
+With a `match_budget`, missions whose budget no longer fits in the time left
+in the match are skipped.
+"""
+
+from pybricks.tools import StopWatch, multitask, run_task, wait
+
+OK = "ok"
+OVER = "over"
+TIMEOUT = "timeout"
+SKIPPED = "skipped"
+
+# Length of a match, in milliseconds.
+MATCH_MS = 150_000
+
+
+class DriveTo:
+    """A mission that only drives to (x, y), e.g. between missions."""
+
+    def __init__(
+        self,
+        x: float,
+        y: float,
+        budget: float | None = None,
+    ):
+        self.x = x
+        self.y = y
+        self.budget = budget
+
+    def run(self, robot, attachment):
+        robot.drive_to(self.x, self.y)
+
+    async def run_async(self, robot, attachment):
+        await robot.drive_to_async(self.x, self.y)
+
+
+class TableMission:
+    """A mission compiled into a command table by `mission_compiler`."""
+
+    def __init__(
+        self,
+        name: str,
+        table,
+        budget: float | None = None,
+    ):
+        self.name = name
+        self.table = table
+        self.budget = budget
+
+    def run(self, robot, attachment):
+        robot.run_table(self.table, attachment)
+
+    async def run_async(self, robot, attachment):
+        await robot.run_table_async(self.table, attachment)
+
+
+class MissionRunner:
+    def __init__(
+        self,
+        robot,
+        attachment,
+        match_budget: float | None = None,
+    ):
+        """Creates a runner.
+
+        Args:
+            robot: The `ArtemisBase` passed to the missions.
+            attachment: The attachment passed to the missions.
+            match_budget: If set, the time available for all the missions,
+                in milliseconds.
+        """
+        self.robot = robot
+        self.attachment = attachment
+        self.match_budget = match_budget
+        self.watch = StopWatch()
+        # (name, duration in ms, budget or None, status) for each mission.
+        self.results = []
+
+    async def _run_with_budget(self, mission, budget: float):
+        finished = [False]
+
+        async def run_mission():
+            await mission.run_async(self.robot, self.attachment)
+            finished[0] = True
+
+        await multitask(run_mission(), wait(budget), race=True)
+        return finished[0]
+
+    def _abort(self):
+        """Stops everything after a timeout and takes the pose from odometry."""
+        robot = self.robot
+        robot.stop()
+        if self.attachment is not None:
+            self.attachment.stop()
+        robot.odometry.update()
+        robot.pose.set(robot.odometry.x, robot.odometry.y, robot.angle())
+
+    def run_mission(self, mission) -> str:
+        """Runs one mission and records how long it took.
+
+        Returns: the status of the mission, one of OK, OVER, TIMEOUT or
+          SKIPPED.
+        """
+        name = getattr(mission, "name", type(mission).__name__)
+        budget = getattr(mission, "budget", None)
+        if (
+            self.match_budget is not None
+            and budget is not None
+            and self.watch.time() + budget > self.match_budget
+        ):
+            self.results.append((name, 0, budget, SKIPPED))
+            return SKIPPED
+
+        start = self.watch.time()
+        status = OK
+        if budget is not None and hasattr(mission, "run_async"):
+            if not run_task(self._run_with_budget(mission, budget)):
+                status = TIMEOUT
+                self._abort()
+        else:
+            mission.run(self.robot, self.attachment)
+        duration = self.watch.time() - start
+        if status == OK and budget is not None and duration > budget:
+            status = OVER
+        self.results.append((name, duration, budget, status))
+        return status
+
+    def run(self, missions, summary: bool = True):
+        """Runs the missions in order, then prints a summary.
+
+        Args:
+            missions: The missions to run.
+            summary: Whether to print the timing summary at the end.
+        """
+        self.watch.reset()
+        for mission in missions:
+            self.run_mission(mission)
+        if summary:
+            self.print_summary()
+
+    def print_summary(self):
+        """Prints one line per mission: name, time, budget and status."""
+        for name, duration, budget, status in self.results:
+            budget = "-" if budget is None else budget
+            print(f"{name:<16}{duration:>7}{budget:>7}  {status}")
+        print(f"{'total':<16}{self.watch.time():>7}")
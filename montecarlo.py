@@ -0,0 +1,310 @@
+"""Monte Carlo estimates of how position error builds up over missions.
+
+`ArtemisBase.drive_to` assumes the robot arrives exactly where it was sent,
+so each move is planned from the commanded pose and the errors of earlier
+moves are never corrected. This module replays the moves of a run many
+times at once with NumPy, each replay with its own sampled errors, to show
+how far the real robot ends up from the commanded pose after each mission:
+
+```
+with fake_pybricks.installed():
+    import sand_ship_bucket_flip as run
+
+trace = montecarlo.trace(
+    [run.SandPull(), run.ShipPush(), run.BucketFlip(), run.HoopPull()],
+)
+results = montecarlo.simulate(trace, montecarlo.ErrorModel(), samples=10000)
+montecarlo.report(results)
+```
+
+or from the command line:
+
+```
+python montecarlo.py sand_ship_bucket_flip SandPull ShipPush BucketFlip
+```
+
+The moves are traced with `fake.Base`, so they are the turns and straights
+`ArtemisBase` would make. Turns end at a heading measured by the gyro, so
+heading errors don't add up from turn to turn, apart from the gyro's own
+scale error. Straights are where the position error comes from.
+"""
+
+import importlib
+import math
+import sys
+from unittest import mock
+
+import numpy as np
+
+import artemis_config
+import fake
+
+with mock.patch.dict(sys.modules, {"umath": math}):
+    import geometry
+    import planner
+
+
+class ErrorModel:
+    def __init__(
+        self,
+        heading_sigma: float = 1.0,
+        gyro_scale_sigma: float = 0.003,
+        distance_sigma: float = 0.01,
+        distance_noise: float = 1.0,
+        slip: float = 0.005,
+        track_sigma: float = 0.5,
+    ):
+        """Creates an error model. All errors are normally distributed.
+
+        Args:
+            heading_sigma: Standard deviation of where turns settle around
+                their target, in degrees.
+            gyro_scale_sigma: Standard deviation of the gyro's scale error,
+                drawn once per run. The heading error it causes grows with
+                the total rotation.
+            distance_sigma: Standard deviation of the distance driven, as a
+                fraction of the distance.
+            distance_noise: Standard deviation of the distance driven, in
+                mm, on top of `distance_sigma`.
+            slip: Average fraction of each straight lost to wheel slip at
+                the configured straight speed. It grows with the speed.
+            track_sigma: Standard deviation of the direction straights
+                actually travel in, in degrees.
+        """
+        self.heading_sigma = heading_sigma
+        self.gyro_scale_sigma = gyro_scale_sigma
+        self.distance_sigma = distance_sigma
+        self.distance_noise = distance_noise
+        self.slip = slip
+        self.track_sigma = track_sigma
+
+    def __repr__(self):
+        return (
+            f"ErrorModel(heading_sigma={self.heading_sigma}, " +
+            f"gyro_scale_sigma={self.gyro_scale_sigma}, " +
+            f"distance_sigma={self.distance_sigma}, " +
+            f"distance_noise={self.distance_noise}, " +
+            f"slip={self.slip}, " +
+            f"track_sigma={self.track_sigma})"
+        )
+
+
+class Trace:
+    """The moves of a run, and where each mission ends."""
+
+    def __init__(self, start: tuple[float, float, float]):
+        self.start = start
+        # (op, value, speed) with planner's op codes: value is the heading
+        # for TURN, the distance for STRAIGHT and (x, y) for RESET. Speed is
+        # relative to the configured straight speed.
+        self.moves = []
+        # (mission name, number of moves so far, commanded (x, y, heading)).
+        self.steps = []
+
+
+class _Attachment:
+    """Accepts any attachment call, which doesn't move the robot."""
+
+    def __getattr__(self, name):
+        def ignore(*args, **kwargs):
+            return None
+
+        return ignore
+
+
+def trace(
+    missions,
+    start: dict | None = None,
+    config: artemis_config.ArtemisConfig | None = None,
+) -> Trace:
+    """Runs `missions` on a `fake.Base` and records their moves.
+
+    Args:
+        missions: Objects with a `run(robot, attachment)` method.
+        start: The starting position as dict(x=..., y=...). Defaults to the
+            first mission's `start`.
+        config: The robot configuration, for straight speeds.
+    """
+    if config is None:
+        config = artemis_config.ArtemisConfig.default()
+    if start is None:
+        start = missions[0].start
+    base = fake.Base(config=config)
+    base.reset_position(**start)
+    log = base.log
+    result = Trace((base.x, base.y, base.heading))
+    default_speed = config.motion_config.straight_speed
+    attachment = _Attachment()
+    first = len(log)
+    x, y = base.x, base.y
+    for mission in missions:
+        mission.run(base, attachment)
+        for i in range(first, len(log)):
+            entry = log[i]
+            method = entry["method"]
+            params = entry["params"]
+            if method == "turn_to":
+                result.moves.append((planner.TURN, params["heading"], 1))
+            elif method == "straight":
+                # Measure the distance, in case a timeout cut it short.
+                distance = np.hypot(entry["x"] - x, entry["y"] - y)
+                if params["distance"] < 0:
+                    distance = -distance
+                speed = params["speed"] or default_speed
+                result.moves.append(
+                    (planner.STRAIGHT, distance, speed / default_speed)
+                )
+            elif method == "reset_position":
+                result.moves.append(
+                    (planner.RESET, (params["x"], params["y"]), 1)
+                )
+            x, y = entry["x"], entry["y"]
+        first = len(log)
+        result.steps.append(
+            (type(mission).__name__, len(result.moves), (x, y, base.heading))
+        )
+    return result
+
+
+class Dispersion:
+    """Where the robot ends up after one mission, over all the samples."""
+
+    def __init__(
+        self,
+        name: str,
+        commanded: tuple[float, float, float],
+        x: np.ndarray,
+        y: np.ndarray,
+        heading: np.ndarray,
+    ):
+        self.name = name
+        self.commanded = commanded
+        self.x = x
+        self.y = y
+        self.heading = heading
+
+    def errors(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """The (x, y, heading) errors of each sample."""
+        cx, cy, ch = self.commanded
+        heading_error = geometry.compute_turns(ch, self.heading)
+        return self.x - cx, self.y - cy, heading_error
+
+    def summary(self) -> dict:
+        """Bias, spread and 95th percentile of the position error, in mm."""
+        dx, dy, dh = self.errors()
+        return {
+            "mission": self.name,
+            "bias_x": float(dx.mean()),
+            "bias_y": float(dy.mean()),
+            "std_x": float(dx.std()),
+            "std_y": float(dy.std()),
+            "std_heading": float(dh.std()),
+            "r95": float(np.percentile(np.hypot(dx, dy), 95)),
+        }
+
+
+def simulate(
+    trace: Trace,
+    model: ErrorModel | None = None,
+    samples: int = 10000,
+    rng: np.random.Generator | None = None,
+    relocalize: bool = False,
+) -> list[Dispersion]:
+    """Replays the moves of `trace` with sampled errors.
+
+    Args:
+        trace: The moves, from `trace`.
+        model: The errors to sample.
+        samples: The number of replays.
+        rng: The random number generator, for repeatable results.
+        relocalize: If True, `reset_position` puts the robot back at the
+            position it is given, as if it squared up against a wall.
+            Otherwise it only changes where the robot thinks it is.
+
+    Returns: The dispersion at the end of each mission.
+    """
+    if model is None:
+        model = ErrorModel()
+    if rng is None:
+        rng = np.random.default_rng()
+    x0, y0, h0 = trace.start
+    x = np.full(samples, float(x0))
+    y = np.full(samples, float(y0))
+    heading = np.full(samples, float(h0))
+    # The gyro's heading error, which grows as the robot turns.
+    gyro_scale = rng.normal(0, model.gyro_scale_sigma, samples)
+    gyro_error = np.zeros(samples)
+    commanded_heading = float(h0)
+
+    results = []
+    steps = iter(trace.steps)
+    step = next(steps, None)
+    for i, (op, value, speed) in enumerate(trace.moves):
+        if op == planner.TURN:
+            turn = geometry.compute_turn(commanded_heading, value)
+            commanded_heading = value
+            gyro_error -= gyro_scale * turn
+            heading = (
+                value
+                + gyro_error
+                + rng.normal(0, model.heading_sigma, samples)
+            )
+        elif op == planner.STRAIGHT:
+            lost = rng.exponential(model.slip * speed, samples)
+            distance = (
+                value
+                * (1 + rng.normal(0, model.distance_sigma, samples) - lost)
+                + rng.normal(0, model.distance_noise, samples)
+            )
+            track = heading + rng.normal(0, model.track_sigma, samples)
+            x, y = geometry.compute_new_positions(x, y, track, distance)
+        elif op == planner.RESET and relocalize:
+            x = np.full(samples, float(value[0]))
+            y = np.full(samples, float(value[1]))
+        while step is not None and step[1] == i + 1:
+            results.append(Dispersion(step[0], step[2], x, y, heading))
+            step = next(steps, None)
+    while step is not None:
+        results.append(Dispersion(step[0], step[2], x, y, heading))
+        step = next(steps, None)
+    return results
+
+
+def report(results: list[Dispersion]):
+    """Prints a table of the dispersion after each mission."""
+    headers = ["mission", "bias_x", "bias_y", "std_x", "std_y",
+               "std_heading", "r95"]
+    rows = []
+    for dispersion in results:
+        summary = dispersion.summary()
+        rows.append(
+            [summary["mission"]]
+            + [f"{summary[key]:.1f}" for key in headers[1:]]
+        )
+    widths = [
+        max(len(str(item)) for item in column)
+        for column in zip(headers, *rows, strict=True)
+    ]
+    print(" | ".join(h.ljust(w) for h, w in zip(headers, widths, strict=True)))
+    print("-+-".join("-" * w for w in widths))
+    for row in rows:
+        print(
+            " | ".join(
+                item.ljust(w) for item, w in zip(row, widths, strict=True)
+            )
+        )
+
+
+def main():
+    import fake_pybricks
+
+    module_name, *mission_names = sys.argv[1:]
+    with fake_pybricks.installed():
+        module = importlib.import_module(module_name)
+        missions = [getattr(module, name)() for name in mission_names]
+        results = simulate(trace(missions))
+    report(results)
+
+
+if __name__ == "__main__":
+    main()
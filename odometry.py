@@ -0,0 +1,108 @@
+"""Odometry: dead reckoning from the drive encoders and the hub's heading.
+
+The distance driven comes from the average of the two drive motor encoders
+and the heading comes from the hub's gyro, which doesn't drift with wheel
+slip the way the difference between the encoders does. Each update advances
+the pose along the average of the old and new headings, by the chord of the
+arc driven rather than its length, so that a curve with a steady turn rate
+comes out right however long it is between updates.
+
+`ArtemisBase` updates its odometry at the end of every move, and runs
+`Odometry.run` during `arc_to`. To also track the pose while other moves
+are running, run it next to the mission:
+
+```
+async def main():
+    await robot.drive_to_async(500, 500)
+
+run_task(multitask(robot.odometry.run(), main(), race=True))
+```
+"""
+
+from pybricks.pupdevices import Motor
+from umath import pi, radians, sin
+
+import geometry
+from pacing import Pacer
+
+# Default time between samples in the background task, in milliseconds.
+_PERIOD_MS = 10
+
+
+class Odometry:
+    def __init__(
+        self,
+        left_drive: Motor,
+        right_drive: Motor,
+        heading,
+        wheel_diameter: float,
+    ):
+        """Creates the odometry for a pair of drive motors.
+
+        Args:
+            left_drive: The left drive motor.
+            right_drive: The right drive motor.
+            heading: Function returning the robot's heading in degrees.
+            wheel_diameter: The wheel diameter in millimeters.
+        """
+        self.left_drive = left_drive
+        self.right_drive = right_drive
+        self.heading = heading
+        self.mm_per_degree = pi * wheel_diameter / 360
+        self.samples = 0
+        self.pose = geometry.Pose()
+        self.reset()
+
+    @property
+    def x(self) -> float:
+        return self.pose.x
+
+    @property
+    def y(self) -> float:
+        return self.pose.y
+
+    def reset(
+        self,
+        x: float = 0,
+        y: float = 0,
+    ):
+        """Sets the current position, keeping the encoders and heading."""
+        self._left = self.left_drive.angle()
+        self._right = self.right_drive.angle()
+        self._heading = self.heading()
+        self.pose.set(x, y, self._heading)
+
+    def update(self):
+        """Integrates the movement since the last update."""
+        left = self.left_drive.angle()
+        right = self.right_drive.angle()
+        heading = self.heading()
+        distance = (
+            (left - self._left + right - self._right) / 2 * self.mm_per_degree
+        )
+        turn = geometry.compute_turn(self._heading, heading)
+        if turn != 0:
+            # An arc of this length turning by `turn` spans a chord this
+            # much shorter.
+            half = radians(turn) / 2
+            distance *= sin(half) / half
+        self.pose.advance(distance, self._heading + turn / 2)
+        self.pose.heading = heading
+        self._left = left
+        self._right = right
+        self._heading = heading
+        self.samples += 1
+
+    async def run(self, period: float = _PERIOD_MS):
+        """Updates the pose every `period` milliseconds, forever.
+
+        The samples are paced by a `Pacer` rather than by waiting a fixed
+        time after each update, so the rate doesn't drift.
+        """
+        pacer = Pacer(period)
+        while True:
+            self.update()
+            await pacer.wait()
+
+    def __repr__(self):
+        return f"Odometry({self.pose})"
@@ -0,0 +1,44 @@
+"""Pacer: runs a loop at a fixed period, scheduled from a stopwatch.
+
+```
+pacer = Pacer(10)
+while True:
+    odometry.update()
+    await pacer.wait()
+```
+
+Each step is due a whole number of periods after the pacer was created, so
+the time the loop body takes doesn't make the rate drift. If the body runs
+past the next step, the schedule starts again from then rather than running
+a burst of steps to catch up.
+"""
+
+from pybricks.tools import StopWatch, wait
+
+
+class Pacer:
+    def __init__(self, period: float):
+        """Creates a pacer, starting the schedule now.
+
+        Args:
+            period: The time between steps, in milliseconds.
+        """
+        self.period = period
+        self.watch = StopWatch()
+        self.next_time = 0
+
+    def wait(self):
+        """Waits until the next step is due.
+
+        Returns: the `wait` to await, inside a task.
+        """
+        self.next_time += self.period
+        delay = self.next_time - self.watch.time()
+        if delay < 0:
+            # We fell behind, so start counting again from now.
+            self.next_time = self.watch.time()
+            delay = 0
+        return wait(delay)
+
+    def __repr__(self):
+        return f"Pacer({self.period})"
@@ -0,0 +1,162 @@
+"""Compiles waypoint lists into flat lists of turn and straight commands.
+
+Missions describe routes as lists of `dict(x=..., y=...)` waypoints. Rather
+than turning to face every waypoint and driving forward, `compile_route`
+picks forward or reverse for each leg so that the total rotation is as small
+as possible, drops legs that are too short to drive and leaves out turns
+that are already within the heading tolerance.
+
+```
+commands = planner.compile_route(
+    robot.x, robot.y, robot.angle(), GoHome.positions,
+)
+```
+
+Each command is a tuple whose first item is the op code:
+
+- `(TURN, heading)`: turn to face `heading`.
+- `(STRAIGHT, distance, x, y)`: drive `distance` and arrive at `(x, y)`.
+
+Compiled missions (see `mission_compiler`) use a few more, and their TURN
+and STRAIGHT commands may end with a speed and an acceleration, either of
+which can be None for the default:
+
+- `(TURN, heading, speed, acceleration)`
+- `(STRAIGHT, distance, x, y, speed, acceleration)`
+- `(RESET, x, y)`: tell the robot it is at `(x, y)`.
+- `(LEFT_ARM, speed, position)`, `(RIGHT_ARM, speed, position)`: move an
+  arm of the attachment.
+- `(ARMS, speed, left, right)`: move both arms at once with
+  `AttachmentAlpha.move_to_pose`. Either position can be None to leave that
+  arm where it is.
+- `(WAIT, time)`: wait `time` milliseconds.
+- `(CONTACT, distance, x, y)`, optionally with a speed and an acceleration
+  like STRAIGHT: drive `distance`, but stop as soon as the robot pushes
+  against something, see `ContactConfig`. The robot is left where it
+  stopped; the commands after it assume it got to `(x, y)`.
+
+`ArtemisBase.run_table` runs any of them.
+"""
+
+from umath import cos, radians
+
+import geometry
+
+TURN = 0
+STRAIGHT = 1
+RESET = 2
+LEFT_ARM = 3
+RIGHT_ARM = 4
+WAIT = 5
+ARMS = 6
+CONTACT = 7
+
+
+class Gear:
+    FWD = 'FWD'
+    REV = 'REV'
+
+
+def _leg_heading(heading: float, gear: str) -> float:
+    """The direction the robot faces while driving a leg towards `heading`."""
+    if gear == Gear.REV:
+        return (heading + 180) % 360
+    return heading
+
+
+def compile_route(
+    x: float,
+    y: float,
+    heading: float,
+    waypoints: list,
+    heading_tolerance: float = 0,
+    min_distance: float = 0,
+) -> list:
+    """Compiles a list of waypoints into turn and straight commands.
+
+    Args:
+        x: The starting x position.
+        y: The starting y position.
+        heading: The starting heading in degrees.
+        waypoints: The points to visit in order, as dicts with `x` and `y`
+            keys. A waypoint with a `gear` key forces that gear for the leg
+            ending there; otherwise the gear is chosen to minimize rotation.
+        heading_tolerance: Turns no bigger than this many degrees are left out.
+            The leg is then driven along the heading the robot already has,
+            as far as it gets closest to the waypoint, and the next leg
+            starts from there.
+        min_distance: Legs no longer than this many millimeters are left out.
+
+    Returns: a list of commands, see the module docstring.
+    """
+    # Each leg is (target heading, distance, x, y, allowed gears).
+    legs = []
+    start_x = x
+    start_y = y
+    for waypoint in waypoints:
+        leg_heading, distance = geometry.compute_trajectory(
+            x, y, waypoint["x"], waypoint["y"],
+        )
+        if distance <= min_distance:
+            continue
+        gear = waypoint.get("gear")
+        gears = (gear,) if gear is not None else (Gear.FWD, Gear.REV)
+        legs.append((leg_heading, distance, waypoint["x"], waypoint["y"], gears))
+        x = waypoint["x"]
+        y = waypoint["y"]
+
+    # Viterbi over the gear of each leg. Each path is
+    # (total rotation, heading after the leg, gears so far).
+    paths = {None: (0, heading, [])}
+    for leg_heading, _, _, _, gears in legs:
+        new_paths = {}
+        for gear in gears:
+            facing = _leg_heading(leg_heading, gear)
+            best = None
+            for rotation, current, chosen in paths.values():
+                turn = abs(geometry.compute_turn(current, facing))
+                if turn <= heading_tolerance:
+                    candidate = (rotation, current, chosen)
+                else:
+                    candidate = (rotation + turn, facing, chosen)
+                if best is None or candidate[0] < best[0]:
+                    best = candidate
+            new_paths[gear] = (best[0], best[1], best[2] + [gear])
+        paths = new_paths
+    best = min(paths.values(), key=lambda path: path[0])
+
+    commands = []
+    current = heading
+    x = start_x
+    y = start_y
+    for i in range(len(legs)):
+        gear = best[2][i]
+        _, _, leg_x, leg_y, _ = legs[i]
+        # Plan from where the robot will be, which is short of the last
+        # waypoint if its turn was left out.
+        leg_heading, distance = geometry.compute_trajectory(x, y, leg_x, leg_y)
+        facing = _leg_heading(leg_heading, gear)
+        if gear == Gear.REV:
+            distance = -distance
+        turn = geometry.compute_turn(current, facing)
+        if abs(turn) > heading_tolerance:
+            commands.append((TURN, facing))
+            current = facing
+            x, y = leg_x, leg_y
+        else:
+            distance *= cos(radians(turn))
+            if abs(distance) <= min_distance:
+                continue
+            x, y = geometry.compute_new_position(x, y, current, distance)
+        commands.append((STRAIGHT, distance, x, y))
+    return commands
+
+
+def total_rotation(heading: float, commands: list) -> float:
+    """The total rotation in degrees needed to run `commands`."""
+    rotation = 0
+    for command in commands:
+        if command[0] == TURN:
+            rotation += abs(geometry.compute_turn(heading, command[1]))
+            heading = command[1]
+    return rotation
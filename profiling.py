@@ -0,0 +1,292 @@
+"""Timing instrumentation for robot methods.
+
+Records are kept in preallocated lists that are used as a ring buffer, so
+recording a call doesn't allocate on the hub's small heap. Times are
+`StopWatch` milliseconds and poses are rounded to whole millimeters and
+degrees. Nothing is printed until `dump` is called, usually once at the end
+of the program:
+
+```
+hub, robot, attachment = init()
+profiling.enable(robot)
+SandPull().run(robot, attachment)
+profiling.dump()
+```
+
+Methods are instrumented with the `profile` decorator, which does nothing
+but call the method until profiling is enabled. Inside `run_task`, where a
+method returns an awaitable instead of blocking, the call is timed until
+the awaitable finishes. Code that can't be decorated, like the body of an
+async function, can use `section`. Each section keeps its own start time,
+so sections running at the same time under `multitask` don't mix up:
+
+```
+with profiling.section("lift"):
+    await attachment.left_arm_move(200, 100)
+```
+"""
+
+from pybricks.tools import StopWatch
+
+from records import Recorder
+
+# Default number of records to keep.
+_CAPACITY = 128
+
+# Calls nested deeper than this are not recorded.
+_MAX_DEPTH = 8
+
+# ustruct codes for the columns when dumped as binary records.
+_FORMAT = "HBIIhhhhh"
+
+_COLUMNS = (
+    "method",
+    "depth",
+    "start",
+    "end",
+    "commanded_x",
+    "commanded_y",
+    "achieved_x",
+    "achieved_y",
+    "heading",
+)
+
+
+class Profiler:
+    def __init__(
+        self,
+        robot=None,
+        capacity: int = _CAPACITY,
+    ):
+        """Creates a profiler.
+
+        Args:
+            robot: If set, an `ArtemisBase` whose commanded pose (`x`, `y`)
+                and achieved pose (`odometry`) are recorded with each call.
+            capacity: How many records to keep. Older records are
+                overwritten once the buffer is full.
+        """
+        self.robot = robot
+        self.capacity = capacity
+        self.watch = StopWatch()
+        self.names = []
+        self._name_ids = {}
+        self.count = 0
+        self.method = [0] * capacity
+        self.depth = [0] * capacity
+        self.start = [0] * capacity
+        self.end = [0] * capacity
+        self.commanded_x = [0] * capacity
+        self.commanded_y = [0] * capacity
+        self.achieved_x = [0] * capacity
+        self.achieved_y = [0] * capacity
+        self.heading = [0] * capacity
+        # How many calls are running, for the depth of the next one.
+        self._depth = 0
+
+    def name_id(self, name: str) -> int:
+        """Returns the id used to store `name`, registering it if needed."""
+        name_id = self._name_ids.get(name)
+        if name_id is None:
+            name_id = len(self.names)
+            self.names.append(name)
+            self._name_ids[name] = name_id
+        return name_id
+
+    def begin(self) -> int:
+        """Marks the start of a call and returns the start time."""
+        self._depth += 1
+        return self.watch.time()
+
+    def finish(
+        self,
+        name_id: int,
+        start: int,
+        depth: int,
+    ):
+        """Records a call that started at `start`, `depth` calls deep."""
+        end = self.watch.time()
+        self._depth -= 1
+        if depth >= _MAX_DEPTH:
+            return
+        i = self.count % self.capacity
+        self.method[i] = name_id
+        self.depth[i] = depth
+        self.start[i] = start
+        self.end[i] = end
+        robot = self.robot
+        if robot is not None:
+            self.commanded_x[i] = int(robot.x)
+            self.commanded_y[i] = int(robot.y)
+            self.achieved_x[i] = int(robot.odometry.x)
+            self.achieved_y[i] = int(robot.odometry.y)
+            self.heading[i] = int(robot.angle())
+        self.count += 1
+
+    def section(self, name: str):
+        """Returns a context manager that records the code it wraps."""
+        return _Section(self, self.name_id(name))
+
+    def rows(self):
+        """Yields the records from oldest to newest."""
+        first = max(0, self.count - self.capacity)
+        for n in range(first, self.count):
+            i = n % self.capacity
+            yield (
+                self.names[self.method[i]],
+                self.depth[i],
+                self.start[i],
+                self.end[i],
+                self.commanded_x[i],
+                self.commanded_y[i],
+                self.achieved_x[i],
+                self.achieved_y[i],
+                self.heading[i],
+            )
+
+    def dump(self, binary: bool = False):
+        """Prints the records.
+
+        Args:
+            binary: If True, prints them as compact `records.Recorder`
+                records named "profile". Otherwise prints them as CSV
+                between <START LOGS> and <END LOGS>.
+        """
+        if binary:
+            recorder = Recorder("profile", _FORMAT, _COLUMNS)
+            recorder.label("method", self.names)
+            first = max(0, self.count - self.capacity)
+            for n in range(first, self.count):
+                i = n % self.capacity
+                recorder.emit(
+                    self.method[i],
+                    self.depth[i],
+                    self.start[i],
+                    self.end[i],
+                    self.commanded_x[i],
+                    self.commanded_y[i],
+                    self.achieved_x[i],
+                    self.achieved_y[i],
+                    self.heading[i],
+                )
+            recorder.flush()
+            return
+        print("<START LOGS>")
+        print(",".join(_COLUMNS))
+        for row in self.rows():
+            print(",".join(str(value) for value in row))
+        print("<END LOGS>")
+
+
+_profiler = None
+
+
+def enable(
+    robot=None,
+    capacity: int = _CAPACITY,
+) -> Profiler:
+    """Starts recording calls to profiled methods."""
+    global _profiler
+    _profiler = Profiler(robot=robot, capacity=capacity)
+    return _profiler
+
+
+def disable():
+    """Stops recording and drops the records."""
+    global _profiler
+    _profiler = None
+
+
+def section(name: str):
+    """Records the wrapped code as `name`, if profiling is enabled."""
+    if _profiler is None:
+        return _NO_SECTION
+    return _profiler.section(name)
+
+
+def dump(binary: bool = False):
+    """Prints the records, if profiling is enabled. See `Profiler.dump`."""
+    if _profiler is not None:
+        _profiler.dump(binary=binary)
+
+
+def _is_awaitable(result) -> bool:
+    # Coroutines are generators on the hub, and pybricks awaitables can be
+    # closed; neither has `__await__` there.
+    return (
+        hasattr(result, "__await__")
+        or hasattr(result, "send")
+        or hasattr(result, "close")
+    )
+
+
+async def _timed(
+    profiler: Profiler,
+    name_id: int,
+    start: int,
+    depth: int,
+    awaitable,
+):
+    """Awaits `awaitable`, then records the call that returned it."""
+    try:
+        return await awaitable
+    finally:
+        profiler.finish(name_id, start, depth)
+
+
+def profile(method):
+    """Decorator recording the duration of each call to `method`."""
+    name = method.__name__
+
+    def with_profiling(self, *args, **kwargs):
+        profiler = _profiler
+        if profiler is None:
+            return method(self, *args, **kwargs)
+        name_id = profiler.name_id(name)
+        depth = profiler._depth
+        start = profiler.begin()
+        try:
+            result = method(self, *args, **kwargs)
+        except BaseException:
+            profiler.finish(name_id, start, depth)
+            raise
+        if result is not None and _is_awaitable(result):
+            return _timed(profiler, name_id, start, depth, result)
+        profiler.finish(name_id, start, depth)
+        return result
+
+    return with_profiling
+
+
+class _Section:
+    """Records the code it wraps, with its own start time and depth."""
+
+    def __init__(
+        self,
+        profiler: Profiler,
+        name_id: int,
+    ):
+        self.profiler = profiler
+        self.name_id = name_id
+        self.start = 0
+        self.depth = 0
+
+    def __enter__(self):
+        self.depth = self.profiler._depth
+        self.start = self.profiler.begin()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profiler.finish(self.name_id, self.start, self.depth)
+        return False
+
+
+class _NoSection:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NO_SECTION = _NoSection()
@@ -0,0 +1,110 @@
+"""Compact binary records for sending data from the hub to the host.
+
+Printing a line of text for every sample is slow over Bluetooth and holds up
+the program while it's sent. A `Recorder` instead packs each record into a
+preallocated buffer and prints a whole batch at once as a single base64
+line. Three kinds of lines are printed:
+
+```
+@S <name> <format> <field>,<field>,...   The schema, printed once.
+@E <name> <field> <label>,<label>,...    Names for the values of an integer
+                                          field, optional.
+@R <name> <base64>                       A batch of packed records.
+```
+
+The format uses `ustruct` codes, one per field, always little-endian.
+`telemetry.LogParser` decodes the records on the host.
+
+```
+recorder = Recorder("scan", "Ihh", ("time", "left", "right"))
+recorder.emit(watch.time(), left.angle(), right.angle())
+recorder.flush()
+```
+"""
+
+try:
+    from ustruct import calcsize, pack_into
+except ImportError:
+    from struct import calcsize, pack_into
+
+try:
+    from ubinascii import b2a_base64
+except ImportError:
+    try:
+        from binascii import b2a_base64
+    except ImportError:
+        b2a_base64 = None
+
+# Records packed into the buffer before it is printed.
+_BATCH = 16
+
+_BASE64 = b"ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/"
+
+
+def _encode(data) -> str:
+    """Encodes `data` as base64 without a trailing newline."""
+    if b2a_base64 is not None:
+        return b2a_base64(data).decode().rstrip("\n")
+    out = bytearray()
+    for i in range(0, len(data), 3):
+        chunk = data[i : i + 3]
+        n = len(chunk)
+        value = chunk[0] << 16
+        if n > 1:
+            value |= chunk[1] << 8
+        if n > 2:
+            value |= chunk[2]
+        out.append(_BASE64[(value >> 18) & 63])
+        out.append(_BASE64[(value >> 12) & 63])
+        out.append(_BASE64[(value >> 6) & 63] if n > 1 else 61)
+        out.append(_BASE64[value & 63] if n > 2 else 61)
+    return out.decode()
+
+
+class Recorder:
+    def __init__(
+        self,
+        name: str,
+        fmt: str,
+        fields,
+        batch: int = _BATCH,
+    ):
+        """Creates a recorder and prints its schema.
+
+        Args:
+            name: The name of the stream, without spaces.
+            fmt: One `ustruct` code per field, e.g. "Ihh".
+            fields: The names of the fields.
+            batch: How many records to collect before printing them.
+        """
+        if len(fmt) != len(fields):
+            raise ValueError("Need one format code per field.")
+        self.name = name
+        self.fmt = "<" + fmt
+        self.size = calcsize(self.fmt)
+        self.batch = batch
+        self.buffer = bytearray(self.size * batch)
+        self.view = memoryview(self.buffer)
+        self.count = 0
+        print("@S", name, fmt, ",".join(fields))
+
+    def label(
+        self,
+        field: str,
+        labels,
+    ):
+        """Prints names for the integer values 0, 1, ... of `field`."""
+        print("@E", self.name, field, ",".join(labels))
+
+    def emit(self, *values):
+        """Adds a record, printing the batch if it is full."""
+        pack_into(self.fmt, self.buffer, self.count * self.size, *values)
+        self.count += 1
+        if self.count == self.batch:
+            self.flush()
+
+    def flush(self):
+        """Prints the records collected so far."""
+        if self.count:
+            print("@R", self.name, _encode(self.view[: self.count * self.size]))
+            self.count = 0
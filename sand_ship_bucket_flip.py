@@ -1,8 +1,10 @@
 from pybricks.hubs import PrimeHub
 from pybricks.tools import wait
 
+import profiling
 from alpha import AttachmentAlpha
 from artemis_base_v2 import ArtemisBase, Gear
+from mission_runner import MATCH_MS, MissionRunner
 
 WEST_START = dict(
     x=350,
@@ -15,6 +17,7 @@ def init() -> tuple[PrimeHub, ArtemisBase, AttachmentAlpha]:
     attachment = AttachmentAlpha(
         left_motor=robot.left_attachment,
         right_motor=robot.right_attachment,
+        hub=hub,
     )
     robot.reset_position(**WEST_START)
     attachment.init()
@@ -22,6 +25,7 @@ def init() -> tuple[PrimeHub, ArtemisBase, AttachmentAlpha]:
 
 
 class SandPull:
+    budget = 9_000
     start = WEST_START
     forward_point = dict(x=350, y=400)
     shipwreck = dict(x=726, y=95)
@@ -67,6 +71,7 @@ class SandPull:
 
 
 class ShipPush:
+    budget = 9_500
     start = dict(x=680, y=95)
     push_position = dict(x=770, y=243)
     push_end = dict(x=967, y=243)
@@ -87,8 +92,8 @@ class ShipPush:
         # Driving to where you push up the ship
         robot.drive_to(**self.push_position)
         
-        # Pushing up the ship
-        robot.drive_to(**self.push_end)
+        # Pushing up the ship, stopping once it is all the way up
+        robot.drive_to(**self.push_end, contact=True)
         
         # Moving back
         robot.drive_to(**self.back_position, gear=Gear.REV)
@@ -112,8 +117,30 @@ class ShipPush:
             position=self.arm_up_position,
         )
 
+    async def run_async(
+        self,
+        robot: ArtemisBase,
+        attachment: AttachmentAlpha,
+    ) -> None:
+        # The same as `run`, but the runner can stop it if the ship jams.
+        await robot.drive_to_async(**self.push_position)
+        await robot.drive_to_async(**self.push_end, contact=True)
+        await robot.drive_to_async(**self.back_position, gear=Gear.REV)
+        await robot.turn_to_async(self.turn_heading)
+        await attachment.left_arm_move(
+            speed=self.slow_arm_speed,
+            position=self.arm_down_position,
+        )
+        await robot.straight_async(-self.backward_distance)
+        robot.reset_position(**self.reset_position)
+        await attachment.left_arm_move(
+            speed=self.fast_arm_speed,
+            position=self.arm_up_position,
+        )
+
 
 class BucketFlip:
+    budget = 5_000
     start = dict(x=698, y=290)
     bucket_approach = dict(x=1225, y=600)
     right_arm_speed = 200
@@ -140,6 +167,7 @@ class BucketFlip:
 
 
 class HoopPull:
+    budget = 15_000
     start = dict(x=1225, y=600)
     bucket_position = dict(x=1196, y=530)
     skewer_heading_1 = 90
@@ -180,6 +208,7 @@ class HoopPull:
         robot.drive_to(**self.home_position, gear=Gear.REV)
 
 class GoHome:
+    budget = 2_000
     positions = [
         dict(x=1980, y=120),
     ]
@@ -194,8 +223,15 @@ class GoHome:
 
 if __name__ == "__main__":
     hub, robot, attachment = init()
-    SandPull().run(robot, attachment)
-    ShipPush().run(robot, attachment)
-    BucketFlip().run(robot, attachment)
-    HoopPull().run(robot, attachment)
-    GoHome().run(robot, attachment)
+    profiling.enable(robot)
+    runner = MissionRunner(robot, attachment, match_budget=MATCH_MS)
+    runner.run(
+        [
+            SandPull(),
+            ShipPush(),
+            BucketFlip(),
+            HoopPull(),
+            GoHome(),
+        ]
+    )
+    profiling.dump(binary=True)
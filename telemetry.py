@@ -0,0 +1,308 @@
+"""Host-side parsing of the logs the hub prints.
+
+The hub prints its logs as CSV between `<START LOGS>` and `<END LOGS>` (see
+`profiling.dump`). `LogParser` is fed the hub's output one line at a time,
+as it arrives, and:
+
+- passes ordinary output lines back to the caller,
+- keeps each log block as NumPy columns that grow as rows arrive,
+- appends each block to its own CSV file in the log directory.
+
+```
+parser = telemetry.LogParser(".logs", "sand_ship")
+for line in lines:
+    if not parser.feed(line):
+        print(line)
+parser.blocks[-1].arrays()["end"]
+```
+
+It also decodes the binary records printed by `records.Recorder`. Each
+stream ends up in `parser.streams[name]`, and all records in a batch are
+decoded at once with `np.frombuffer`.
+"""
+
+import base64
+import pathlib
+
+import numpy as np
+
+START = "<START LOGS>"
+END = "<END LOGS>"
+
+SCHEMA = "@S"
+LABELS = "@E"
+RECORDS = "@R"
+
+# NumPy types for the `ustruct` codes `records.Recorder` can use.
+_DTYPES = {
+    "b": "<i1",
+    "B": "<u1",
+    "h": "<i2",
+    "H": "<u2",
+    "i": "<i4",
+    "I": "<u4",
+    "l": "<i4",
+    "L": "<u4",
+    "q": "<i8",
+    "Q": "<u8",
+    "f": "<f4",
+    "d": "<f8",
+    "?": "?",
+}
+
+_INITIAL_CAPACITY = 256
+
+
+class Column:
+    """A NumPy array that grows by doubling as values are appended."""
+
+    __slots__ = ("_data", "_size")
+
+    def __init__(self, dtype):
+        self._data = np.empty(_INITIAL_CAPACITY, dtype=dtype)
+        self._size = 0
+
+    def append(self, value):
+        if self._size == len(self._data):
+            grown = np.empty(2 * len(self._data), dtype=self._data.dtype)
+            grown[: self._size] = self._data
+            self._data = grown
+        self._data[self._size] = value
+        self._size += 1
+
+    def extend(self, values: np.ndarray):
+        needed = self._size + len(values)
+        if needed > len(self._data):
+            capacity = len(self._data)
+            while capacity < needed:
+                capacity *= 2
+            grown = np.empty(capacity, dtype=self._data.dtype)
+            grown[: self._size] = self._data[: self._size]
+            self._data = grown
+        self._data[self._size : needed] = values
+        self._size = needed
+
+    def array(self) -> np.ndarray:
+        """A view of the values appended so far."""
+        return self._data[: self._size]
+
+    def __len__(self):
+        return self._size
+
+
+def _parse_value(text: str):
+    try:
+        return float(text)
+    except ValueError:
+        return text
+
+
+class LogBlock:
+    """One block of logs, stored column by column."""
+
+    def __init__(self, header: list[str], path: pathlib.Path | None = None):
+        self.header = header
+        self.path = path
+        self.columns = None
+
+    def append(self, fields: list[str]):
+        if len(fields) != len(self.header):
+            raise ValueError(
+                f"Row has {len(fields)} fields "
+                f"but the header has {len(self.header)}."
+            )
+        values = [_parse_value(field) for field in fields]
+        if self.columns is None:
+            # The first row decides which columns are numeric.
+            self.columns = [
+                Column(np.float64 if isinstance(value, float) else object)
+                for value in values
+            ]
+        for column, value in zip(self.columns, values, strict=True):
+            if column.array().dtype == np.float64 and isinstance(value, str):
+                value = np.nan
+            column.append(value)
+
+    def arrays(self) -> dict[str, np.ndarray]:
+        """The columns so far, by name."""
+        if self.columns is None:
+            return {name: np.empty(0) for name in self.header}
+        return {
+            name: column.array()
+            for name, column in zip(self.header, self.columns, strict=True)
+        }
+
+    def __len__(self):
+        return 0 if self.columns is None else len(self.columns[0])
+
+
+class RecordStream:
+    """The binary records of one `records.Recorder`, stored column by column."""
+
+    def __init__(
+        self,
+        name: str,
+        fmt: str,
+        fields: list[str],
+        path: pathlib.Path | None = None,
+    ):
+        if len(fmt) != len(fields):
+            raise ValueError(
+                f"Schema for {name} has {len(fmt)} codes "
+                f"but {len(fields)} fields."
+            )
+        self.name = name
+        self.fields = fields
+        self.dtype = np.dtype(
+            [
+                (field, _DTYPES[code])
+                for field, code in zip(fields, fmt, strict=True)
+            ]
+        )
+        self.columns = {
+            field: Column(self.dtype[field]) for field in fields
+        }
+        self.labels = {}
+        self.path = path
+        if path is not None:
+            with path.open("w") as f:
+                f.write(",".join(fields) + "\n")
+
+    def append_encoded(self, data: str):
+        """Decodes a base64 batch of records and appends them."""
+        records = np.frombuffer(base64.b64decode(data), dtype=self.dtype)
+        for field in self.fields:
+            self.columns[field].extend(records[field])
+        if self.path is not None:
+            with self.path.open("a") as f:
+                np.savetxt(
+                    f,
+                    np.column_stack([records[field] for field in self.fields]),
+                    delimiter=",",
+                    fmt="%g",
+                )
+
+    def arrays(self) -> dict[str, np.ndarray]:
+        """The columns so far, by name. Labeled fields are given as names."""
+        arrays = {}
+        for field, column in self.columns.items():
+            values = column.array()
+            if field in self.labels:
+                values = np.asarray(self.labels[field], dtype=object)[values]
+            arrays[field] = values
+        return arrays
+
+    def __len__(self):
+        return len(self.columns[self.fields[0]])
+
+
+class LogParser:
+    def __init__(
+        self,
+        log_dir: str | pathlib.Path | None = ".logs",
+        stem: str = "log",
+        on_row=None,
+        on_block=None,
+    ):
+        """Creates a parser.
+
+        Args:
+            log_dir: Directory to write each block and record stream to as
+                CSV, or None to keep the logs in memory only.
+            stem: Start of the file names, which end in the block number
+                or the stream name.
+            on_row: Called as `on_row(block)` after each row is parsed, or
+                `on_row(stream)` after each batch of records.
+            on_block: Called as `on_block(block)` when a block ends.
+        """
+        self.log_dir = None if log_dir is None else pathlib.Path(log_dir)
+        self.stem = stem
+        self.on_row = on_row
+        self.on_block = on_block
+        self.blocks = []
+        self.streams = {}
+        self._in_logs = False
+        self._header = None
+        self._file = None
+
+    def _open(self):
+        if self.log_dir is None:
+            return None
+        self.log_dir.mkdir(parents=True, exist_ok=True)
+        path = self.log_dir / f"{self.stem}_{len(self.blocks)}.csv"
+        self._file = path.open("w")
+        return path
+
+    def _write(self, line: str):
+        if self._file is not None:
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def _close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def feed(self, line: str) -> bool:
+        """Parses one line of output.
+
+        Returns: True if the line was part of a log block, False if it is
+          ordinary output.
+        """
+        line = line.rstrip("\r\n")
+        if line.startswith("@"):
+            return self._feed_record(line)
+        if line == START:
+            self._in_logs = True
+            self._header = None
+            return True
+        if not self._in_logs:
+            return False
+        if line == END:
+            self._in_logs = False
+            self._close()
+            if self._header is not None and self.on_block is not None:
+                self.on_block(self.blocks[-1])
+            return True
+        if not line:
+            return True
+        if self._header is None:
+            self._header = line.split(",")
+            path = self._open()
+            self.blocks.append(LogBlock(self._header, path))
+            self._write(line)
+            return True
+        block = self.blocks[-1]
+        block.append(line.split(","))
+        self._write(line)
+        if self.on_row is not None:
+            self.on_row(block)
+        return True
+
+    def _feed_record(self, line: str) -> bool:
+        parts = line.split(" ")
+        kind = parts[0]
+        if kind == RECORDS and len(parts) == 3 and parts[1] in self.streams:
+            stream = self.streams[parts[1]]
+            stream.append_encoded(parts[2])
+            if self.on_row is not None:
+                self.on_row(stream)
+            return True
+        if kind == SCHEMA and len(parts) == 4:
+            path = None
+            if self.log_dir is not None:
+                self.log_dir.mkdir(parents=True, exist_ok=True)
+                path = self.log_dir / f"{self.stem}_{parts[1]}.csv"
+            self.streams[parts[1]] = RecordStream(
+                parts[1], parts[2], parts[3].split(","), path,
+            )
+            return True
+        if kind == LABELS and len(parts) == 4 and parts[1] in self.streams:
+            self.streams[parts[1]].labels[parts[2]] = parts[3].split(",")
+            return True
+        return False
+
+    def close(self):
+        """Closes any block left open, e.g. if the program crashed."""
+        self._in_logs = False
+        self._close()
@@ -3,7 +3,9 @@
 from pybricks.hubs import PrimeHub
 from pybricks.parameters import Direction, Port
 from pybricks.pupdevices import Motor
-from pybricks.tools import multitask, run_task, wait
+from pybricks.tools import StopWatch, multitask, run_task, wait
+
+from records import Recorder
 
 BIG_GEAR_TEETH = 60
 WEE_GEAR_TEETH = 12
@@ -41,9 +43,22 @@ async def position_scanner(angle, speed):
 
 
 async def scan_cycle(angles: list[float], orbit=30):
+    watch = StopWatch()
+    scans = Recorder(
+        "scan",
+        "Ihhhh",
+        ("time", "angle", "left", "right", "turntable"),
+        batch=1,
+    )
     for a in angles:
         await position_scanner(a, 200)
-        print(f"Scanning at angle {a}")
+        scans.emit(
+            watch.time(),
+            a,
+            left_scanner_motor.angle(),
+            right_scanner_motor.angle(),
+            turntable_motor.angle(),
+        )
         await wait(orbit * 1000)
 
 